@@ -0,0 +1,33 @@
+import time
+from dataclasses import dataclass
+
+from .llm import LLM
+
+
+@dataclass
+class Throughput:
+    tokens: int
+    seconds: float
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens / self.seconds if self.seconds > 0 else 0.0
+
+
+def measure(llm: LLM, prompts: list[str], max_new_tokens: int = 64) -> Throughput:
+    """
+    Generates up to `max_new_tokens` tokens for each of the `prompts` one at a
+    time and returns the number of generated tokens and the time it took.
+    """
+    llm.reset_stats()
+    start = time.perf_counter()
+    for prompt in prompts:
+        llm.prompt(
+            prompt,
+            lambda result: result,
+            max_new_tokens=max_new_tokens,
+            min_new_tokens=max_new_tokens,
+        )
+    seconds = time.perf_counter() - start
+    tokens = llm.stats.output_token_count - llm.stats.input_token_count
+    return Throughput(tokens, seconds)
@@ -1,13 +1,83 @@
+import tree_sitter as ts
+
 from ...treesitter.python import tsLang, tsParser
 from .limiter import Limiter
 
 _errQuery = tsLang.query("(ERROR)")
 
 
+def _common_prefix(a: bytes, b: bytes) -> int:
+    limit = min(len(a), len(b))
+    if a[:limit] == b[:limit]:
+        return limit
+    # Binary search, as equality of prefixes is monotone in their length.
+    low, high = 0, limit - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix(a: bytes, b: bytes, limit: int) -> int:
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle :] == b[len(b) - middle :]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _point(source: bytes, offset: int) -> tuple[int, int]:
+    row = source.count(b"\n", 0, offset)
+    return row, offset - source.rfind(b"\n", 0, offset) - 1
+
+
 class FunctionLimiter(Limiter):
+    """
+    Extracts the first function definition once it is followed by other code.
+    The syntax tree of the previous result is reused and only the changed part
+    of the result is parsed again, such that checking a growing output after
+    each token is cheap.
+    """
+
+    def __init__(self):
+        self._source = None
+        self._tree = None
+
+    def __copy__(self) -> "FunctionLimiter":
+        # Trees are edited in place and can not be shared.
+        return FunctionLimiter()
+
+    def _parse(self, source: bytes) -> ts.Tree:
+        old = self._source
+        if self._tree is not None and old == source:
+            return self._tree
+        if self._tree is None:
+            tree = tsParser.parse(source)
+        else:
+            start = _common_prefix(old, source)
+            suffix = _common_suffix(old, source, min(len(old), len(source)) - start)
+            old_end, new_end = len(old) - suffix, len(source) - suffix
+            self._tree.edit(
+                start_byte=start,
+                old_end_byte=old_end,
+                new_end_byte=new_end,
+                start_point=_point(old, start),
+                old_end_point=_point(old, old_end),
+                new_end_point=_point(source, new_end),
+            )
+            tree = tsParser.parse(source, self._tree)
+        self._source, self._tree = source, tree
+        return tree
+
     def extract_result(self, result: str) -> str | None:
         source = result.encode()
-        tree = tsParser.parse(source)
+        tree = self._parse(source)
         root = tree.root_node
         count = len(root.children)
         if (
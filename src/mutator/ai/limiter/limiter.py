@@ -1,4 +1,5 @@
 import abc
+import copy
 from collections.abc import Callable
 
 import torch
@@ -11,20 +12,96 @@ class Limiter(abc.ABC):
         raise NotImplementedError
 
 
+class _Stream:
+    """
+    Decodes the tokens of a single row incrementally. Only the tokens added
+    since the last call are decoded, with a few previous tokens as context such
+    that word boundaries are decoded correctly (as in text streamers).
+    """
+
+    def __init__(self, tokenizer: PreTrainedTokenizer, ids: torch.Tensor, limiter):
+        self.ids = ids
+        self.prefix_offset = max(len(ids) - 5, 0)
+        self.read_offset = len(ids)
+        self.text = tokenizer.decode(ids)
+        self.limiter = copy.copy(limiter)
+        self.done = False
+
+    def clone(self) -> "_Stream":
+        clone = copy.copy(self)
+        clone.limiter = copy.copy(self.limiter)
+        return clone
+
+    def continues(self, ids: torch.Tensor) -> bool:
+        return len(ids) >= len(self.ids) and torch.equal(ids[: len(self.ids)], self.ids)
+
+    def update(self, tokenizer: PreTrainedTokenizer, ids: torch.Tensor):
+        prefix_text = tokenizer.decode(ids[self.prefix_offset : self.read_offset])
+        new_text = tokenizer.decode(ids[self.prefix_offset :])
+        # Incomplete UTF-8 sequences are decoded once the next token arrives.
+        if len(new_text) > len(prefix_text) and not new_text.endswith("\ufffd"):
+            self.text += new_text[len(prefix_text) :]
+            self.prefix_offset = self.read_offset
+            self.read_offset = len(ids)
+        self.ids = ids
+
+
 class OutputStoppingCriteria(StoppingCriteria):
+    """
+    Stops each row of a batch as soon as `limiter` extracts a result from it.
+    Rows belong to the prompts in order, several adjacent rows may belong to the
+    same prompt (e.g. with `num_return_sequences`). Each row is transformed
+    with the function of its prompt in `transform_results` after removing the
+    `padding` tokens of its prompt.
+
+    Every row is decoded incrementally and has its own copy of `limiter`, which
+    may keep state between calls (see `FunctionLimiter`). Rows reordered by
+    beam search continue the state of the row they descend from.
+    """
+
     def __init__(
         self,
         limiter: Limiter,
         tokenizer: PreTrainedTokenizer,
-        transform_result: Callable[[str], str],
+        transform_results: list[Callable[[str], str]],
+        padding: list[int] | None = None,
     ):
         self.limiter = limiter
         self.tokenizer = tokenizer
-        self.transform_result = transform_result
+        self.transform_results = transform_results
+        self.padding = padding or [0] * len(transform_results)
+        self._streams = []
+
+    def _stream(self, row: int, ids: torch.Tensor, used: set[int]) -> _Stream:
+        previous = self._streams
+        candidates = [row] if row < len(previous) else []
+        candidates += range(len(previous))
+        for candidate in candidates:
+            if previous[candidate].continues(ids):
+                if candidate in used:
+                    return previous[candidate].clone()
+                used.add(candidate)
+                return previous[candidate]
+        return _Stream(self.tokenizer, ids, self.limiter)
 
     def __call__(
         self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs
-    ) -> bool:
-        input = self.tokenizer.decode(input_ids[0])
-        input = self.transform_result(input)
-        return self.limiter.extract_result(input) is not None
+    ) -> torch.BoolTensor:
+        rows_per_prompt = input_ids.shape[0] // len(self.transform_results)
+        streams = []
+        used = set()
+        for row, ids in enumerate(input_ids):
+            index = row // rows_per_prompt
+            ids = ids[self.padding[index] :]
+            stream = self._stream(row, ids, used)
+            if not stream.done:
+                stream.update(self.tokenizer, ids)
+                input = self.transform_results[index](stream.text)
+                stream.done = stream.limiter.extract_result(input) is not None
+            streams.append(stream)
+        self._streams = streams
+        return torch.tensor(
+            [stream.done for stream in streams],
+            dtype=torch.bool,
+            device=input_ids.device,
+        )
@@ -1,6 +1,7 @@
 import gc
 import pathlib
 import random
+import traceback
 from collections.abc import Callable
 
 import torch
@@ -10,6 +11,7 @@ from .limiter.limiter import Limiter, OutputStoppingCriteria
 from .limiter.special_tokens import SpecialTokensLimiter
 from .llm_result import LLMResult
 from .llm_stats import LLMStats
+from .prefix_cache import PrefixCache
 
 
 class LLM:
@@ -18,28 +20,57 @@ class LLM:
         device: str,
         model_id_or_checkpoint: str | pathlib.Path,
         limiter_classes: list[type[Limiter]] | None = None,
+        batch_size: int = 8,
+        prefix_cache: int = 0,
+        prefix_min_length: int = 32,
+        quantize: str | None = None,
         **generate_kwargs,
     ):
+        """
+        Up to `batch_size` prompts are generated at once. The key value caches of
+        recent prompts are kept for up to `prefix_cache` bytes to skip the
+        prefill of shared prompt prefixes of at least `prefix_min_length` tokens
+        (see `PrefixCache`).
+
+        Weights are loaded in half precision on GPUs and in full precision on
+        CPUs. `quantize` selects `bf16` weights or dynamically quantized `int8`
+        linear layers (CPU only) instead.
+        """
         self.stats = LLMStats()
         self.device = torch.device(device)
+        dtype = torch.float16 if self.device.type != "cpu" else torch.float32
+        if quantize == "bf16":
+            dtype = torch.bfloat16
+        elif quantize == "int8" and self.device.type != "cpu":
+            raise ValueError("int8 quantization is only supported on CPU")
+        elif quantize not in [None, "int8"]:
+            raise ValueError(f"unknown quantization {quantize}")
         if isinstance(model_id_or_checkpoint, pathlib.Path):
             import peft
 
             self.model = peft.AutoPeftModelForCausalLM.from_pretrained(
                 model_id_or_checkpoint,
                 device_map=self.device,
-                torch_dtype=torch.float16,
+                torch_dtype=dtype,
             )
             model_id = self.model.peft_config["default"].base_model_name_or_path
         else:
             self.model = transformers.AutoModelForCausalLM.from_pretrained(
                 model_id_or_checkpoint,
                 device_map=self.device,
-                torch_dtype=torch.float16,
+                torch_dtype=dtype,
             )
             model_id = model_id_or_checkpoint
+        if quantize == "int8":
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
         self.tokenizer = transformers.GemmaTokenizer.from_pretrained(model_id)
         self.limiter_classes = limiter_classes or []
+        self.batch_size = batch_size
+        self.prefix_cache = (
+            PrefixCache(prefix_cache, prefix_min_length) if prefix_cache > 0 else None
+        )
         self.generate_kwargs = generate_kwargs
 
     def reset_stats(self):
@@ -52,14 +83,38 @@ class LLM:
         transform_result: Callable[[str], str],
         **extra_args,
     ) -> list[LLMResult]:
-        input_token_count = inputs["input_ids"].shape[1]
+        results = self.generate_batch(
+            [prompt], inputs, [transform_result], **extra_args
+        )
+        return results[0]
+
+    def generate_batch(
+        self,
+        prompts: list[str],
+        inputs: dict,
+        transform_results: list[Callable[[str], str]],
+        **extra_args,
+    ) -> list[list[LLMResult]]:
+        """
+        Generates the results of all `prompts` with a single call of the model.
+        `inputs` contains one left padded row of tokens per prompt. Returns the
+        results of each prompt, transformed with the corresponding function of
+        `transform_results`.
+        """
+        input_ids = inputs["input_ids"]
+        attention_mask = inputs.get("attention_mask")
+        if attention_mask is None:
+            padding = [0] * len(prompts)
+        else:
+            padding = (attention_mask.shape[1] - attention_mask.sum(dim=1)).tolist()
         self.stats.generate_count += 1
 
         bos_len = len(self.tokenizer.bos_token)
 
-        def transform(result: str) -> str:
-            return transform_result(result[bos_len:])
+        def transform(transform_result: Callable[[str], str]) -> Callable[[str], str]:
+            return lambda result: transform_result(result[bos_len:])
 
+        transforms = [transform(t) for t in transform_results]
         limiters = [limiter_class() for limiter_class in self.limiter_classes]
         eos_tokens = [
             self.tokenizer.eos_token,
@@ -79,26 +134,85 @@ class LLM:
             **self.generate_kwargs,
             **extra_args,
             "eos_token_id": eos_token_ids,
+            "pad_token_id": self.tokenizer.pad_token_id,
             "stopping_criteria": transformers.StoppingCriteriaList(
                 [
-                    OutputStoppingCriteria(limiter, self.tokenizer, transform)
+                    OutputStoppingCriteria(limiter, self.tokenizer, transforms, padding)
                     for limiter in limiters
                 ]
                 + self.generate_kwargs.get("stopping_criteria", [])
                 + extra_args.get("stopping_criteria", [])
             ),
         }
+        prompt_ids = None
+        if (
+            self.prefix_cache is not None
+            and len(prompts) == 1
+            and padding[0] == 0
+            and "past_key_values" not in kwargs
+        ):
+            prompt_ids = input_ids[0].tolist()
+            kwargs["return_dict_in_generate"] = True
+            length, cache = self.prefix_cache.lookup(prompt_ids, len(prompt_ids) - 1)
+            if cache is not None:
+                # Generate expands the rows of the prompt, but not its cache.
+                expand = kwargs.get("num_beams", 1)
+                if expand == 1:
+                    expand = kwargs.get("num_return_sequences", 1)
+                if expand > 1:
+                    cache.batch_repeat_interleave(expand)
+                kwargs["past_key_values"] = cache
+                self.stats.cached_token_count += length
         try:
             with torch.no_grad():
                 outputs = self.model.generate(**inputs, **kwargs)
         except torch.cuda.OutOfMemoryError:
+            if self.prefix_cache is not None:
+                self.prefix_cache.clear()
+            if len(prompts) > 1:
+                # Retry with smaller batches before giving up on any prompt.
+                middle = len(prompts) // 2
+                return [
+                    *self.generate_batch(
+                        prompts[:middle],
+                        {key: value[:middle] for key, value in inputs.items()},
+                        transform_results[:middle],
+                        **extra_args,
+                    ),
+                    *self.generate_batch(
+                        prompts[middle:],
+                        {key: value[middle:] for key, value in inputs.items()},
+                        transform_results[middle:],
+                        **extra_args,
+                    ),
+                ]
             print("\nwarning: caught out of memory error, skip")
             self.stats.out_of_memory_count += 1
-            return []
+            return [[]]
+
+        if prompt_ids is not None:
+            cache = outputs.past_key_values
+            outputs = outputs.sequences
+            if cache is not None:
+                cache.batch_select_indices(torch.tensor([0], device=outputs.device))
+                if cache.get_seq_length() > len(prompt_ids):
+                    cache.crop(len(prompt_ids) - cache.get_seq_length())
+                self.prefix_cache.store(prompt_ids, cache)
+
+        def decode(index: int, output: torch.Tensor) -> LLMResult:
+            output = output[padding[index] :]
+            input_token_count = input_ids.shape[1] - padding[index]
+            pad_token_indices = torch.where(output == self.tokenizer.pad_token_id)[0]
+            output_token_count = (
+                len(output)
+                if len(pad_token_indices) == 0
+                else pad_token_indices[0].item()
+            )
+            self.stats.input_token_count += input_token_count
+            self.stats.output_token_count += output_token_count
 
-        def decode(output):
             output = self.tokenizer.decode(output)
-            transformed = transform(output)
+            transformed = transforms[index](output)
             result = transformed
             local_limiters = limiters.copy()
             while True:
@@ -111,48 +225,159 @@ class LLM:
                 else:
                     # no limiter trimmed anything
                     break
-            return LLMResult(prompt, output, transformed, result)
+            return LLMResult(
+                prompts[index],
+                output,
+                transformed,
+                result,
+                input_token_count,
+                output_token_count,
+            )
 
-        for output in outputs:
-            self.stats.input_token_count += input_token_count
-            null_token_indices = torch.where(output == 0)[0]
-            output_token_count = (
-                len(output)
-                if len(null_token_indices) == 0
-                else null_token_indices[0].item()
+        # Rows of the same prompt are adjacent (e.g. with `num_return_sequences`).
+        rows_per_prompt = outputs.shape[0] // len(prompts)
+        results = [[] for _ in prompts]
+        for row, output in enumerate(outputs):
+            index = row // rows_per_prompt
+            results[index].append(decode(index, output))
+        return results
+
+    def _pad(self, rows: list[list[int]]) -> dict:
+        width = max(len(row) for row in rows)
+        pad_token_id = self.tokenizer.pad_token_id
+        return {
+            "input_ids": torch.tensor(
+                [[pad_token_id] * (width - len(row)) + row for row in rows]
+            ).to(self.device),
+            "attention_mask": torch.tensor(
+                [[0] * (width - len(row)) + [1] * len(row) for row in rows]
+            ).to(self.device),
+        }
+
+    def _generate_rows(
+        self,
+        prompts: list[str],
+        rows: list[list[int]],
+        transform_results: list[Callable[[str], str]],
+        **extra_args,
+    ) -> list[list[LLMResult]]:
+        results = []
+        for start in range(0, len(prompts), self.batch_size):
+            end = start + self.batch_size
+            results += self._generate_isolated(
+                prompts[start:end],
+                rows[start:end],
+                transform_results[start:end],
+                **extra_args,
             )
-            self.stats.output_token_count += output_token_count
-        return [decode(output) for output in outputs]
+        gc.collect()
+        return results
+
+    def _generate_isolated(
+        self,
+        prompts: list[str],
+        rows: list[list[int]],
+        transform_results: list[Callable[[str], str]],
+        **extra_args,
+    ) -> list[list[LLMResult]]:
+        """
+        Generates a batch of prompts. If it fails, each prompt is generated on its
+        own, such that an error only discards the results of the failing prompt.
+        """
+        try:
+            return self.generate_batch(
+                prompts, self._pad(rows), transform_results, **extra_args
+            )
+        except Exception as e:
+            if len(prompts) == 1:
+                print("\nwarning: caught exception, skip prompt")
+                traceback.print_exception(e)
+                return [[]]
+        return [
+            results
+            for index in range(len(prompts))
+            for results in self._generate_isolated(
+                prompts[index : index + 1],
+                rows[index : index + 1],
+                transform_results[index : index + 1],
+                **extra_args,
+            )
+        ]
 
     def prompt(
         self, prompt: str, transform_result: Callable[[str], str], **extra_args
     ) -> list[LLMResult]:
-        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
-        results = self.generate(prompt, inputs, transform_result, **extra_args)
-        gc.collect()
-        return results
+        return self.prompt_batch([prompt], [transform_result], **extra_args)[0]
+
+    def prompt_batch(
+        self,
+        prompts: list[str],
+        transform_results: list[Callable[[str], str]],
+        **extra_args,
+    ) -> list[list[LLMResult]]:
+        """
+        Generates the results of several prompts. Up to `batch_size` prompts are
+        passed to the model at once. Returns the results of each prompt.
+        """
+        if len(prompts) == 0:
+            return []
+        rows = self.tokenizer(prompts).input_ids
+        return self._generate_rows(prompts, rows, transform_results, **extra_args)
+
+    def prompt_tries(
+        self,
+        prompt: str,
+        transform_result: Callable[[str], str],
+        tries: int,
+        **extra_args,
+    ) -> list[LLMResult]:
+        """
+        Generates the results of `tries` runs of `prompt`. When sampling, all
+        tries are generated as return sequences of a single run, which shares the
+        prefill of the prompt. Otherwise (e.g. beam search) or if that run fails,
+        each try is a row of the same batch, such that an error only discards the
+        results of the failing try.
+        """
+        kwargs = {**self.generate_kwargs, **extra_args}
+        if kwargs.get("do_sample", False) and kwargs.get("num_beams", 1) == 1:
+            sequences = kwargs.get("num_return_sequences", 1) * tries
+            try:
+                return self.generate_batch(
+                    [prompt],
+                    self._pad(self.tokenizer([prompt]).input_ids),
+                    [transform_result],
+                    **{**extra_args, "num_return_sequences": sequences},
+                )[0]
+            except Exception:
+                # Retry below with one row per try to find the failing ones.
+                pass
+        results = self.prompt_batch(
+            [prompt] * tries, [transform_result] * tries, **extra_args
+        )
+        return [result for prompt_results in results for result in prompt_results]
 
     def prompt_with_random_prefix(
         self,
         prompt: str,
         transform_result: Callable[[str], str],
         keep_prefix_len: int,
+        count: int = 1,
         **extra_args,
     ) -> list[LLMResult]:
-        inputs = self.tokenizer(prompt, return_tensors="pt")
-        num_tokens = inputs.input_ids.shape[1]
+        """
+        Generates results for `count` random prefixes of `prompt`, which are at
+        least `keep_prefix_len` characters long.
+        """
+        input_ids = self.tokenizer(prompt).input_ids
         prefix_len = len(self.tokenizer(prompt[:keep_prefix_len]).input_ids)
-        index = random.randint(prefix_len + 1, num_tokens)
-        for key in inputs.keys():
-            inputs[key] = inputs[key][:, :index]
-        results = self.generate(
-            prompt,
-            inputs.to(self.device),
-            transform_result=transform_result,
-            **extra_args,
+        rows = [
+            input_ids[: random.randint(prefix_len + 1, len(input_ids))]
+            for _ in range(count)
+        ]
+        results = self._generate_rows(
+            [prompt] * count, rows, [transform_result] * count, **extra_args
         )
-        gc.collect()
-        return results
+        return [result for prompt_results in results for result in prompt_results]
 
 
 llm: LLM
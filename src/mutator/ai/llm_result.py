@@ -7,3 +7,5 @@ class LLMResult:
     output: str
     transformed: str
     final: str
+    input_token_count: int = 0
+    output_token_count: int = 0
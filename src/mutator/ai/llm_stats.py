@@ -4,6 +4,7 @@ class LLMStats:
         self.input_token_count = 0
         self.output_token_count = 0
         self.out_of_memory_count = 0
+        self.cached_token_count = 0
 
     def to_dict(self) -> dict:
         return dict(self.__dict__)
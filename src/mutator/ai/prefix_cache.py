@@ -0,0 +1,86 @@
+import collections
+import copy
+
+import torch
+
+
+def _size(value) -> int:
+    if isinstance(value, torch.Tensor):
+        return value.nbytes
+    if isinstance(value, list | tuple):
+        return sum(_size(item) for item in value)
+    if hasattr(value, "__dict__"):
+        return sum(_size(item) for item in vars(value).values())
+    return 0
+
+
+def _common_prefix(a: tuple[int, ...], b: list[int]) -> int:
+    length = 0
+    for x, y in zip(a, b, strict=False):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+def _copy_prefix(cache, length: int):
+    "Copies the first `length` positions of every layer of `cache`."
+    copied = copy.copy(cache)
+    copied.layers = []
+    for layer in cache.layers:
+        layer = copy.copy(layer)
+        if layer.keys is not None:
+            layer.keys = layer.keys[..., :length, :].clone()
+            layer.values = layer.values[..., :length, :].clone()
+        copied.layers.append(layer)
+    return copied
+
+
+class PrefixCache:
+    """
+    Keeps the key value caches (`past_key_values`) of recently generated
+    prompts, until their total size exceeds `budget` bytes. The least recently
+    used caches are dropped first. A cache can be reused by any prompt sharing a
+    prefix of tokens with the cached prompt. Prefixes shorter than
+    `min_length` tokens (e.g. only the BOS token) are not worth the copy and
+    count as misses.
+    """
+
+    def __init__(self, budget: int, min_length: int = 32):
+        self.budget = budget
+        self.min_length = min_length
+        self.size = 0
+        self.entries = collections.OrderedDict()
+
+    def lookup(self, ids: list[int], limit: int) -> tuple[int, object | None]:
+        """
+        Returns the length of the longest cached prefix of `ids` (at most
+        `limit` tokens) and a copy of its cache for that prefix, or `(0, None)`.
+        """
+        best, best_key = self.min_length - 1, None
+        for key in self.entries:
+            length = min(_common_prefix(key, ids), limit)
+            if length > best:
+                best, best_key = length, key
+        if best_key is None:
+            return 0, None
+        self.entries.move_to_end(best_key)
+        return best, _copy_prefix(self.entries[best_key][0], best)
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def store(self, ids: list[int], cache):
+        "Adds the cache of the prompt `ids` (the cache is not copied)."
+        key = tuple(ids)
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+        size = _size(cache)
+        if size > self.budget:
+            return
+        self.entries[key] = (cache, size)
+        self.size += size
+        while self.size > self.budget:
+            _, (_, size) = self.entries.popitem(last=False)
+            self.size -= size
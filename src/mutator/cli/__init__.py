@@ -1,11 +1,14 @@
 import click
 
 from .analyze import dataset, train_result
+from .benchmark import benchmark_llm
 from .collect import collect
 from .generate import generate
 from .inspect import inspect
+from .matrix import kill_matrix
+from .prune import prune
 from .stats import stats
-from .test import test
+from .test import test, test_worker
 from .train import train
 
 
@@ -16,12 +19,16 @@ def cli():
 
 cli.add_command(generate)
 cli.add_command(test)
+cli.add_command(test_worker)
 cli.add_command(inspect)
 cli.add_command(stats)
 cli.add_command(collect)
 cli.add_command(train)
 cli.add_command(dataset)
 cli.add_command(train_result)
+cli.add_command(kill_matrix)
+cli.add_command(prune)
+cli.add_command(benchmark_llm)
 
 __all__ = [
     "cli",
@@ -0,0 +1,116 @@
+import gc
+import pathlib
+
+import click
+
+from ..helper.pattern import Filter
+from ..helper.timed import timed
+from ..source import SourceFile
+
+
+@click.command(
+    help="Compare the generation speed of quantized models with the unquantized "
+    + "model in tokens per second."
+)
+@click.option(
+    "-m",
+    "--model",
+    default="google/codegemma-1.1-2b",
+    show_default=True,
+    help="LLM model to benchmark.",
+)
+@click.option(
+    "-d",
+    "--device",
+    default="cpu",
+    show_default=True,
+    help="Device used to run LLM on.",
+)
+@click.option(
+    "-p",
+    "--project",
+    type=pathlib.Path,
+    default=".",
+    show_default=True,
+    help="Path to project directory. The signatures of its functions are used "
+    + "as prompts.",
+)
+@click.option(
+    "-f",
+    "--filter",
+    multiple=True,
+    default=["*"],
+    help="Specify select filter for identifying functions.",
+)
+@click.option(
+    "-n",
+    "--prompts",
+    type=int,
+    default=8,
+    show_default=True,
+    help="Number of prompts to generate.",
+)
+@click.option(
+    "--max-new-tokens",
+    type=int,
+    default=64,
+    show_default=True,
+    help="Number of tokens generated per prompt.",
+)
+@click.option(
+    "-q",
+    "--quantize",
+    multiple=True,
+    type=click.Choice(["int8", "bf16"]),
+    default=["int8", "bf16"],
+    show_default=True,
+    help="Quantizations compared against the unquantized model.",
+)
+@click.option(
+    "--threads",
+    type=int,
+    default=None,
+    help="Number of threads used for inference on CPU.",
+)
+@timed
+def benchmark_llm(
+    model, device, project, filter, prompts, max_new_tokens, quantize, threads
+):
+    import torch
+
+    from ..ai.benchmark import measure
+    from ..ai.llm import LLM
+
+    if threads is not None:
+        torch.set_num_threads(threads)
+    source_root = pathlib.Path(project.joinpath("src")).resolve()
+    filters = Filter(filter)
+    signatures = [
+        target.get_signature().decode()
+        for file in sorted(source_root.rglob("*.py"))
+        for target in SourceFile(source_root, file, filters).targets
+    ][:prompts]
+    if len(signatures) == 0:
+        print("error: found no functions to use as prompts.")
+        return 1
+
+    print(f"{len(signatures)} prompts, {torch.get_num_threads()} threads")
+    baseline = None
+    for variant in [None, *quantize]:
+        if variant == "int8" and not device.startswith("cpu"):
+            print("skip int8: only supported on cpu")
+            continue
+        llm = LLM(device, model, quantize=variant)
+        result = measure(llm, signatures, max_new_tokens)
+        if baseline is None:
+            baseline = result
+        speedup = result.tokens_per_second / max(baseline.tokens_per_second, 1e-9)
+        print(
+            f"{variant or 'baseline':<10}",
+            f"{result.tokens:>6} tokens",
+            f"{result.seconds:>8.2f}s",
+            f"{result.tokens_per_second:>8.2f} tokens/s",
+            f"{speedup:>6.2f}x",
+        )
+        del llm
+        gc.collect()
@@ -16,6 +16,7 @@ from ..generator import (
     PrefixGenerator,
     Prompt,
 )
+from ..helper.changes import changed_lines
 from ..helper.pattern import Filter
 from ..helper.timed import timed
 from ..source import SourceFile
@@ -155,13 +156,65 @@ configs = {
     "--device",
     default="cuda:0",
     show_default=True,
-    help="GPU device used to run LLM on.",
+    help="Device used to run LLM on (e.g. cuda:0 or cpu).",
+)
+@click.option(
+    "--quantize",
+    type=click.Choice(["int8", "bf16"]),
+    default=None,
+    help="Use bfloat16 weights or dynamically quantized int8 linear layers (CPU "
+    + "only). Weights are stored in float16 on GPUs and float32 on CPUs otherwise.",
+)
+@click.option(
+    "--threads",
+    type=int,
+    default=None,
+    help="Number of threads used for inference on CPU.",
 )
 @click.option(
     "--clean",
     is_flag=True,
     help="Regenerate all mutants. Warning: Will delete all existing mutants.",
 )
+@click.option(
+    "--since",
+    default=None,
+    metavar="REV",
+    help="Only generate mutants for functions changed since this git revision. "
+    + "Existing mutants of other functions are kept.",
+)
+@click.option(
+    "--no-copies",
+    is_flag=True,
+    default=False,
+    help="Only store the mutated function of each mutant instead of a full copy "
+    + "of the mutated source file. Such mutants are reconstructed from the "
+    + "project and can not be tested after their source file changed.",
+)
+@click.option(
+    "--batch-size",
+    type=int,
+    default=8,
+    show_default=True,
+    help="Maximum number of prompts passed to the LLM at once.",
+)
+@click.option(
+    "--prefix-cache",
+    type=int,
+    default=1024,
+    show_default=True,
+    help="Memory in MiB used to keep the key value caches of recent prompts on "
+    + "the device. Prompts sharing a prefix with a cached prompt (e.g. the same "
+    + "prompt of another config) skip its prefill. 0 disables the cache.",
+)
+@click.option(
+    "--prefix-cache-min",
+    type=int,
+    default=32,
+    show_default=True,
+    help="Minimum number of tokens a prompt has to share with a cached prompt "
+    + "to reuse its cache.",
+)
 @timed
 def generate(
     out_dir,
@@ -173,26 +226,55 @@ def generate(
     checkpoint,
     device,
     clean,
+    since,
+    no_copies,
+    batch_size,
+    prefix_cache,
+    prefix_cache_min,
+    quantize,
+    threads,
 ):
+    import torch
+
     import mutator.ai.llm
 
     from ..ai.limiter.function import FunctionLimiter
     from ..ai.llm import LLM
 
+    if quantize == "int8" and not device.startswith("cpu"):
+        print("error: int8 quantization is only supported with `--device cpu`.")
+        return 1
+    if threads is not None:
+        torch.set_num_threads(threads)
+
     filters = Filter(filter)
     sourceRoot = pathlib.Path(project.joinpath("src")).resolve()
+    changes = None
+    if since is not None:
+        changes = changed_lines(project, since)
     source_files = [
         f
         for f in [
-            SourceFile(sourceRoot, file, filters) for file in sourceRoot.rglob("*.py")
+            SourceFile(
+                sourceRoot,
+                file,
+                filters,
+                None
+                if changes is None
+                else changes.get(file.relative_to(sourceRoot), []),
+            )
+            for file in sourceRoot.rglob("*.py")
         ]
         if len(f.symbols) > 0
     ]
 
     if clean and out_dir.exists():
         shutil.rmtree(out_dir)
-    store = MutantStore(out_dir)
-    if not store.isclean():
+    store = MutantStore(out_dir, copies=not no_copies)
+    if changes is not None:
+        removed = store.rebase(sourceRoot, changes)
+        print(f"removed {removed} mutants of functions changed since {since}")
+    elif not store.isclean():
         print("error: found existing mutants. use flag `--clean` to generate new.")
         return 1
 
@@ -207,7 +289,15 @@ def generate(
             "checkpoint" if isinstance(model_or_checkpoint, pathlib.Path) else "model",
             model_or_checkpoint,
         )
-        mutator.ai.llm.llm = LLM(device, model_or_checkpoint, [FunctionLimiter])
+        mutator.ai.llm.llm = LLM(
+            device,
+            model_or_checkpoint,
+            [FunctionLimiter],
+            batch_size=batch_size,
+            prefix_cache=prefix_cache * 1024 * 1024,
+            prefix_min_length=prefix_cache_min,
+            quantize=quantize,
+        )
 
         target_index = 0
 
@@ -0,0 +1,94 @@
+import pathlib
+
+import click
+
+from ..helper.timed import timed
+from ..result import Result
+from ..tester import KillMatrix
+
+
+def read_result(out_dir: pathlib.Path) -> Result | None:
+    """
+    Reads the test results to build a kill matrix from. Returns `None` if some
+    killed mutants were tested with `--fail-fast`, as only the first killing
+    test of those is known.
+    """
+    result = Result(out_dir / "test-result.json")
+    entries = [
+        entry
+        for targets in result.modules.values()
+        for mutants in targets.values()
+        for entry in mutants.values()
+    ]
+    fail_fast = sum(1 for e in entries if e.get("fail_fast") and e.get("killed_by"))
+    if fail_fast > 0:
+        print(
+            f"error: {fail_fast} killed mutants were tested with --fail-fast, which "
+            + "only records their first killing test. Rerun `test` without it."
+        )
+        return None
+    batched = sum(1 for entry in entries if entry.get("batched"))
+    if batched > 0:
+        print(
+            f"warning: {batched} mutants were tested in batches. Failed tests are "
+            + "only attributed to the mutants they were selected for."
+        )
+    return result
+
+
+@click.command(
+    "kill-matrix",
+    help="Builds the matrix of mutants and the tests killing them from the test "
+    + "results. Expects `test` to be run before.",
+)
+@click.option(
+    "-o",
+    "--out-dir",
+    default=pathlib.Path("out", "mutants"),
+    type=pathlib.Path,
+    show_default=True,
+    help="Directory containing the test results. The matrix is stored there.",
+)
+@click.option(
+    "--useless-tests",
+    is_flag=True,
+    default=False,
+    help="List the tests that killed no mutant.",
+)
+@click.option(
+    "--minimal-tests",
+    is_flag=True,
+    default=False,
+    help="List a small subset of tests killing all killed mutants.",
+)
+@click.option(
+    "--subsumed",
+    is_flag=True,
+    default=False,
+    help="List the mutants subsumed by another mutant.",
+)
+@timed
+def kill_matrix(out_dir, useless_tests, minimal_tests, subsumed):
+    result = read_result(out_dir)
+    if result is None:
+        return 1
+    matrix = KillMatrix.from_result(result.modules, list(result.tests))
+    matrix.write(out_dir / "kill-matrix.bin")
+    killed = sum(1 for row in matrix.rows if row != 0)
+    print(f"mutants: {len(matrix.mutants)} killed: {killed} tests: {len(matrix.tests)}")
+
+    def name(index: int) -> str:
+        return ":".join(matrix.mutants[index])
+
+    if useless_tests:
+        print("tests killing no mutant:")
+        for test in matrix.useless_tests():
+            print(f"  {test}")
+    if minimal_tests:
+        print("tests killing all killed mutants:")
+        for test in matrix.minimal_tests():
+            print(f"  {test}")
+    if subsumed:
+        print("subsumed mutants:")
+        for index, other in matrix.subsumed().items():
+            print(f"  {name(index)} by {name(other)}")
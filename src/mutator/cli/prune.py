@@ -0,0 +1,53 @@
+import json
+import pathlib
+
+import click
+
+from ..helper.timed import timed
+from ..store import MutantStore
+from ..tester import KillMatrix
+from .matrix import read_result
+
+
+@click.command(
+    help="Marks mutants subsumed by another mutant in the previous test results, "
+    + "such that `test` skips them. Expects `test` to be run before."
+)
+@click.option(
+    "-o",
+    "--out-dir",
+    default=pathlib.Path("out", "mutants"),
+    type=pathlib.Path,
+    show_default=True,
+    help="Directory to read mutants and test results from.",
+)
+@click.option(
+    "--reset",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Remove all previous marks before marking subsumed mutants.",
+)
+@timed
+def prune(out_dir, reset):
+    result = read_result(out_dir)
+    if result is None:
+        return 1
+    matrix = KillMatrix.from_result(result.modules, list(result.tests))
+    subsumed = {
+        matrix.mutants[index]: ":".join(matrix.mutants[other])
+        for index, other in matrix.subsumed().items()
+    }
+
+    marked = 0
+    for module, target, path, _, metadata in MutantStore(out_dir).list_mutants():
+        subsumed_by = subsumed.get((module, target, path.stem))
+        if subsumed_by is None and (not reset or "subsumed_by" not in metadata):
+            continue
+        if subsumed_by is None:
+            del metadata["subsumed_by"]
+        else:
+            metadata["subsumed_by"] = subsumed_by
+            marked += 1
+        json.dump(metadata, open(path.with_suffix(".json"), "w"))
+    print(f"marked {marked} of {len(matrix.mutants)} mutants as subsumed")
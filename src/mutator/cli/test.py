@@ -1,79 +1,464 @@
+import contextlib
+import functools
+import gzip
+import itertools
+import json
 import multiprocessing
 import os
 import pathlib
+import re
 import shutil
+import signal
+import socket
 import subprocess
 import tempfile
+import time
+from dataclasses import dataclass
 
 import click
 
+from ..helper.changes import changed_lines
 from ..helper.pattern import Filter
 from ..helper.timed import timed
-from ..result import Result
-from ..store import MutantStore
+from ..result import Journal, Result
+from ..source import SourceFile
+from ..store import MutantStore, read_mutant
+from ..tester import (
+    Baseline,
+    BytecodeCache,
+    Coordinator,
+    CostModel,
+    CoverageFailed,
+    RunnerWorker,
+    TestIndex,
+    WorkerCrashed,
+    attribute,
+    collect_coverage,
+    combine,
+    create_sandbox,
+    deduplicate,
+    hash_content,
+    hash_project,
+    kill_order,
+    killing_tests,
+    longest_first,
+    measure_baseline,
+    mutant_key,
+    patch_region,
+    plan_batches,
+    serve_coordinator,
+    syntax_error,
+    work,
+)
 
+_worker: RunnerWorker | None = None
 
-def _run_tester(x):
-    pid = os.getpid()
-    (
-        tmp_dir,
-        project_dir,
-        timeout,
-        git_reset,
-        module_name,
-        target_name,
-        i,
-        mutant,
-        source,
-    ) = x
+# Maximum number of previously killing tests to move to the front per mutant.
+_MAX_FIRST = 16
 
-    project = f"{tmp_dir}/{pid}"
-    if not os.path.exists(project):
+# Notes like `<cpu time limit exceeded>` appended to the output of the runner.
+_note_pattern = re.compile(r"^<[^<>\n]+>$", re.MULTILINE)
 
-        def ignore_outdir(dir, contents):
-            return ["out"]
+# Notes for runners terminated by the signal of a resource limit.
+_SIGNAL_NOTES = {
+    -signal.SIGXCPU: "<cpu time limit exceeded>",
+    -signal.SIGKILL: "<killed by resource limit>",
+}
 
-        shutil.copytree(project_dir, project, ignore=ignore_outdir)
+# Notes of mutants stopped by a resource limit instead of their tests.
+_LIMIT_NOTES = (*_SIGNAL_NOTES.values(), "<memory limit exceeded>")
 
-    if git_reset:
-        subprocess.run(["git", "reset", "--hard"], capture_output=True, cwd=project)
+# Note of mutants no remote worker managed to test.
+_WORKER_ERROR = "<worker error>"
+
+
+def _cacheable(entry: dict) -> bool:
+    """
+    Whether the verdict of `entry` only depends on the mutant and the tests.
+    Timeouts and resource limits depend on the limits of the run.
+    """
+    output = entry.get("output", "")
+    notes = (*_LIMIT_NOTES, _WORKER_ERROR)
+    return not entry["timeout"] and not any(note in output for note in notes)
+
+
+def _summarize(output: str, killed_by: list[str]) -> str:
+    """
+    Replaces the output of a killed mutant by its failed tests, but keeps the
+    notes appended to it.
+    """
+    failed = "".join(f"FAILED {test}\n" for test in killed_by)
+    return failed + "".join(f"{note}\n" for note in _note_pattern.findall(output))
+
+
+@dataclass
+class _Job:
+    "A mutant to test together with the options of the test run."
+
+    tmp_dir: str
+    project: pathlib.Path
+    sandbox: str
+    sandbox_ignore: list[str]
+    timeout: float
+    git_reset: bool
+    mode: str
+    recycle: int
+    fail_fast: bool
+    module_name: str
+    target_name: str
+    index: int
+    mutant: pathlib.Path
+    source: str
+    tests: list[str] | None
+    first: list[str]
+    file_hash: str
+    limits: dict
+    # Expected duration of the selected tests, if a baseline was measured.
+    expected: float | None = None
+
+
+def _patch_list(patches) -> list:
+    return [
+        [module_name, patch if isinstance(patch, dict) else os.path.abspath(patch)]
+        for module_name, patch in patches
+    ]
 
+
+def _region_patch(project, source, content: bytes) -> dict:
+    """
+    Describes the mutant `content` of `source` as a byte range of the source file
+    in `project`, which the runner patches in memory.
+    """
+    original = pathlib.Path(project, "src", source).absolute()
+    start, end, replacement = patch_region(original.read_bytes(), content)
+    return {
+        "file": str(original),
+        "start": start,
+        "end": end,
+        "content": replacement.decode(),
+    }
+
+
+def _run_subprocess(project, timeout, patches, pytest_args, first, limits):
+    usage_file = tempfile.NamedTemporaryFile(suffix=".json")
+    report_file = tempfile.NamedTemporaryFile(suffix=".json")
     args = [
         "python3",
         "-m",
         "mutator_runner",
-        "-m",
-        module_name,
-        "-p",
-        os.path.abspath(mutant),
+        "--patches",
+        "-",
+        *[arg for test in first for arg in ["--first", test]],
+        *[
+            arg
+            for name, value in limits.items()
+            if value is not None
+            for arg in [f"--max-{name}", str(value)]
+        ],
+        "--usage",
+        usage_file.name,
+        "--report",
+        report_file.name,
+        "--",
+        *pytest_args,
     ]
     try:
-        is_timeout = False
         process = subprocess.run(
-            args, capture_output=True, cwd=project, timeout=timeout
+            args,
+            input=json.dumps(_patch_list(patches)).encode(),
+            capture_output=True,
+            cwd=project,
+            timeout=timeout,
         )
-        exit_code = process.returncode
         output = process.stdout.decode()
         output_err = process.stderr.decode()
+        usage, report = [
+            json.loads(content) if len(content) > 0 else None
+            for content in [
+                pathlib.Path(file.name).read_bytes()
+                for file in [usage_file, report_file]
+            ]
+        ]
+        output = output if output != "" else output_err
+        return process.returncode, output, usage, report
     except subprocess.TimeoutExpired:
-        is_timeout = True
-        exit_code = None
-        output = "<timeout>"
-        output_err = "<timeout>"
+        return None, "<timeout>", None, None
+    finally:
+        usage_file.close()
+        report_file.close()
+
+
+def _run_worker(project, timeout, recycle, fork, patches, pytest_args, first, limits):
+    global _worker
+    if _worker is None:
+        _worker = RunnerWorker(project, recycle, fork=fork)
+    try:
+        return _worker.run(_patch_list(patches), timeout, pytest_args, first, limits)
+    except WorkerCrashed:
+        # Retry in a fresh interpreter to isolate the crash from other mutants.
+        return _run_subprocess(project, timeout, patches, pytest_args, first, limits)
 
+
+def _run_patches(project, timeout, mode, recycle, patches, pytest_args, first, limits):
+    if mode in ["worker", "fork"]:
+        return _run_worker(
+            project,
+            timeout,
+            recycle,
+            mode == "fork",
+            patches,
+            pytest_args,
+            first,
+            limits,
+        )
+    return _run_subprocess(project, timeout, patches, pytest_args, first, limits)
+
+
+def _prepare_sandbox(tmp_dir, project_dir, sandbox, sandbox_ignore, git_reset):
+    project = create_sandbox(
+        sandbox, project_dir, pathlib.Path(tmp_dir, str(os.getpid())), sandbox_ignore
+    )
+    if git_reset:
+        subprocess.run(["git", "reset", "--hard"], capture_output=True, cwd=project)
+    return project
+
+
+def _run_tester(job: _Job):
+    content = read_mutant(job.mutant, pathlib.Path(job.project, "src"))
+    return _test_mutant(job, content)
+
+
+def _test_mutant(job: _Job, content: bytes):
+    project = _prepare_sandbox(
+        job.tmp_dir, job.project, job.sandbox, job.sandbox_ignore, job.git_reset
+    )
+
+    start = time.monotonic()
+    pytest_args = [*(["-x"] if job.fail_fast else []), *(job.tests or [])]
+    if job.tests is not None and len(job.tests) == 0:
+        # No test calls the mutated function, so the mutant cannot be killed.
+        exit_code, output, usage, report = 0, "<no covering tests>", None, {}
+    else:
+        exit_code, output, usage, report = _run_patches(
+            project,
+            job.timeout,
+            job.mode,
+            job.recycle,
+            [(job.module_name, _region_patch(project, job.source, content))],
+            pytest_args,
+            job.first,
+            job.limits,
+        )
+    if exit_code in _SIGNAL_NOTES:
+        output += f"\n{_SIGNAL_NOTES[exit_code]}"
+
+    duration = time.monotonic() - start
+    usage = usage or {}
+    is_timeout = exit_code is None
     is_syntax_error = exit_code is not None and exit_code > 1 and not is_timeout
     is_dead = exit_code != 0
-    output = output if output != "" else output_err
     return (
-        module_name,
-        target_name,
-        mutant,
-        source,
+        job.module_name,
+        job.target_name,
+        job.mutant,
+        job.source,
         is_dead,
         is_syntax_error,
         is_timeout,
         output,
+        job.timeout,
+        job.file_hash,
+        duration,
+        usage.get("max_rss"),
+        usage.get("cpu_time"),
+        report,
+    )
+
+
+def _run_batch(batch: list[_Job]) -> list[tuple[tuple, bool]]:
+    """
+    Tests all mutants of `batch` with a single run of their combined tests. Each
+    failed test is attributed to the mutant it covers. Batches with failures
+    that cannot be attributed or other errors are bisected, batches running into
+    their timeout are split into single mutants. Returns the results of all
+    mutants in the same form as `_run_tester`, each paired with whether it comes
+    from a run shared with other mutants.
+    """
+    if len(batch) == 1:
+        return [(_run_tester(batch[0]), False)]
+    options = batch[0]
+    project = _prepare_sandbox(
+        options.tmp_dir,
+        options.project,
+        options.sandbox,
+        options.sandbox_ignore,
+        options.git_reset,
+    )
+
+    combined = {}
+    for job in batch:
+        combined.setdefault((job.module_name, job.source), []).append(
+            read_mutant(job.mutant, pathlib.Path(options.project, "src"))
+        )
+    patches = []
+    for (module_name, source), mutants in combined.items():
+        original = pathlib.Path(project, "src", source).read_bytes()
+        content = combine(original, mutants)
+        if content is None:
+            return _bisect(batch)
+        patches.append((module_name, _region_patch(project, source, content)))
+
+    tests = [job.tests for job in batch]
+    first = [test for job in batch for test in job.first]
+    fail_fast = options.fail_fast
+    pytest_args = [*(["-x"] if fail_fast else []), *[t for ts in tests for t in ts]]
+    # Only one member of the batch needs the slack of its timeout.
+    longest = max(batch, key=lambda job: job.timeout)
+    timeout = longest.timeout + sum(
+        job.expected or 0.0 for job in batch if job is not longest
+    )
+    start = time.monotonic()
+    exit_code, output, usage, report = _run_patches(
+        project,
+        timeout,
+        options.mode,
+        options.recycle,
+        patches,
+        pytest_args,
+        first,
+        options.limits,
+    )
+    duration = (time.monotonic() - start) / len(batch)
+    usage = usage or {}
+    cpu_time = usage.get("cpu_time")
+    if exit_code is None:
+        return [(_run_tester(job), False) for job in batch]
+    failed = killing_tests(report, output) if exit_code == 1 else []
+    if exit_code not in [0, 1] or (exit_code == 1 and len(failed) == 0):
+        return _bisect(batch)
+    killers = attribute(failed, tests)
+    if killers is None:
+        return _bisect(batch)
+
+    results = []
+    unresolved = []
+    for job, killed_by in zip(batch, killers, strict=True):
+        if len(killed_by) == 0 and fail_fast and exit_code == 1:
+            # The tests of this mutant may not have run after the first failure.
+            unresolved.append(job)
+            continue
+        mutant_output = (
+            output
+            if len(killed_by) == 0
+            else "".join(f"FAILED {test}\n" for test in killed_by)
+        )
+        result = (
+            job.module_name,
+            job.target_name,
+            job.mutant,
+            job.source,
+            len(killed_by) > 0,
+            False,
+            False,
+            f"<batch of {len(batch)} mutants>\n{mutant_output}",
+            job.timeout,
+            job.file_hash,
+            duration,
+            usage.get("max_rss"),
+            None if cpu_time is None else cpu_time / len(batch),
+            None
+            if report is None
+            else {test: report[test] for test in job.tests if test in report},
+        )
+        results.append((result, True))
+    if len(unresolved) > 0:
+        results.extend(_run_batch(unresolved))
+    return results
+
+
+def _bisect(batch: list[_Job]) -> list[tuple[tuple, bool]]:
+    middle = len(batch) // 2
+    return _run_batch(batch[:middle]) + _run_batch(batch[middle:])
+
+
+def _serve_targets(
+    address: str, grace: float, source_root: pathlib.Path, targets: list[_Job]
+):
+    """
+    Hands out `targets` to remote workers and yields their results in the same
+    form as `_run_tester`. Mutants failing on the workers are reported as live
+    with the error in their output.
+    """
+    units = []
+    origins = {}
+    for unit_id, job in enumerate(targets):
+        units.append(
+            {
+                "id": unit_id,
+                "module": job.module_name,
+                "target": job.target_name,
+                "index": job.index,
+                "mutant": job.mutant.name,
+                "content": read_mutant(job.mutant, source_root).decode(),
+                "source": job.source,
+                "timeout": job.timeout,
+                "fail_fast": job.fail_fast,
+                "tests": job.tests,
+                "first": job.first,
+                "hash": job.file_hash,
+                "limits": job.limits,
+            }
+        )
+        origins[unit_id] = (job.module_name, job.target_name, job.mutant, job.source)
+    host, port = address.rsplit(":", 1)
+    coordinator = Coordinator(units, grace)
+    server = serve_coordinator(coordinator, host, int(port))
+    print(f"coordinator: listening on {host}:{server.server_address[1]}")
+    try:
+        for unit_id, remote, error in coordinator.results():
+            if remote is None:
+                job = targets[unit_id]
+                name = f"{job.module_name}:{job.target_name}/{job.mutant.stem}"
+                print(f"\nwarning: {name}: {error}")
+                output = f"{error}\n{_WORKER_ERROR}"
+                remote = (False, False, False, output, job.timeout, job.file_hash)
+                remote += (0.0, None, None, None)
+            yield (*origins[unit_id], *remote)
+    finally:
+        server.shutdown()
+
+
+def _run_unit(options: tuple, unit: dict) -> list:
+    tmp_dir, project, sandbox, sandbox_ignore, git_reset, mode, recycle = options
+    job = _Job(
+        tmp_dir=tmp_dir,
+        project=project,
+        sandbox=sandbox,
+        sandbox_ignore=sandbox_ignore,
+        timeout=unit["timeout"],
+        git_reset=git_reset,
+        mode=mode,
+        recycle=recycle,
+        fail_fast=unit["fail_fast"],
+        module_name=unit["module"],
+        target_name=unit["target"],
+        index=unit["index"],
+        mutant=pathlib.Path(unit["module"], unit["target"], unit["mutant"]),
+        source=unit["source"],
+        tests=unit["tests"],
+        first=unit["first"],
+        file_hash=unit["hash"],
+        limits=unit["limits"],
+    )
+    module_name, target_name, mutant, source, *result = _test_mutant(
+        job, unit["content"].encode()
     )
+    return result
+
+
+def _work(url: str, options: tuple):
+    name = f"{socket.gethostname()}-{os.getpid()}"
+    work(url, name, functools.partial(_run_unit, options))
 
 
 @click.command(help="Runs the hole test suite for all mutants.")
@@ -101,7 +486,26 @@ def _run_tester(x):
     help="Specify select filter for identifying mutants.",
 )
 @click.option(
-    "-t", "--timeout", type=int, default=60, help="Test suite timeout in seconds."
+    "-t",
+    "--timeout",
+    type=int,
+    default=60,
+    show_default=True,
+    help="Test suite timeout in seconds. Upper bound if --timeout-factor is used.",
+)
+@click.option(
+    "--timeout-factor",
+    type=float,
+    default=None,
+    help="Derive the timeout of each mutant by multiplying the duration of the "
+    + "unmutated test suite (or of the selected tests) with this factor.",
+)
+@click.option(
+    "--min-timeout",
+    type=float,
+    default=5.0,
+    show_default=True,
+    help="Lower bound in seconds for timeouts derived with --timeout-factor.",
 )
 @click.option(
     "--git-reset",
@@ -117,6 +521,13 @@ def _run_tester(x):
     show_default=True,
     help="Also run tests on dropped mutants. Used for testing purposes.",
 )
+@click.option(
+    "--test-subsumed",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Also run tests on mutants marked as subsumed by `mutator prune`.",
+)
 @click.option(
     "-j",
     "--jobs",
@@ -124,42 +535,493 @@ def _run_tester(x):
     default=4,
     help="Number of parallel jobs to execut in parallel",
 )
+@click.option(
+    "--chunk-size",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of mutants handed to a job at once. Mutants are scheduled by "
+    + "descending expected duration.",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(["subprocess", "worker", "fork"]),
+    default="subprocess",
+    show_default=True,
+    help="Start a new interpreter per mutant, keep one warm worker per job or "
+    + "fork each mutant from a pre-warmed parent (Linux only).",
+)
+@click.option(
+    "--worker-recycle",
+    type=int,
+    default=50,
+    show_default=True,
+    help="Restart a worker after testing this many mutants.",
+)
+@click.option(
+    "--select-tests",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Only run the tests calling the mutated function. The mapping is created "
+    + "by a coverage pass and stored in the out directory.",
+)
+@click.option(
+    "--rebuild-test-index",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Rerun the coverage pass used by --select-tests. It is rerun "
+    + "automatically when the project changed.",
+)
+@click.option(
+    "--sandbox",
+    type=click.Choice(["copy", "link", "none"]),
+    default="copy",
+    show_default=True,
+    help="Run each job in a copy of the project, in a tree of hard links to the "
+    + "project files or directly in the project.",
+)
+@click.option(
+    "--sandbox-ignore",
+    multiple=True,
+    default=["out"],
+    show_default=True,
+    help="Glob of files and directories not to include in the sandbox.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Continue an interrupted run. Skips all mutants recorded in the journal.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Reuse previous results of mutants if neither the mutant nor the source "
+    + "and test files of the project changed.",
+)
+@click.option(
+    "--since",
+    default=None,
+    metavar="REV",
+    help="Only test mutants of functions changed since this git revision. Previous "
+    + "results are reused for all other mutants.",
+)
+@click.option(
+    "--dedup/--no-dedup",
+    default=True,
+    show_default=True,
+    help="Test only one of several equivalent mutants and reuse its result. Mutants "
+    + "equivalent to the source are marked as live without testing.",
+)
+@click.option(
+    "--cache",
+    type=pathlib.Path,
+    default=None,
+    help="Cache file mapping the bytecode of mutated functions to test results. "
+    + "Results are reused as long as the surrounding module and the tests did not "
+    + "change, even across runs and output directories.",
+)
+@click.option(
+    "--fail-fast",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Stop the test suite after the first failing test. Tests that killed "
+    + "mutants of the same target in the previous run are run first.",
+)
+@click.option(
+    "--logs",
+    type=click.Choice(["survivors", "all", "compressed"]),
+    default="survivors",
+    show_default=True,
+    help="Keep the full pytest output in the result only for mutants not killed "
+    + "by a test, for all mutants or store it compressed in the logs directory "
+    + "of the out directory for all mutants.",
+)
+@click.option(
+    "--max-memory",
+    type=int,
+    default=None,
+    help="Address space limit in MiB of the process testing a mutant.",
+)
+@click.option(
+    "--max-cpu",
+    type=float,
+    default=None,
+    help="CPU time limit in seconds per mutant.",
+)
+@click.option(
+    "--max-processes",
+    type=int,
+    default=None,
+    help="Process limit (RLIMIT_NPROC) of the user while testing a mutant. "
+    + "Protects against fork bombs. Not enforced for root.",
+)
+@click.option(
+    "--batch-size",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Test up to this many mutants of different functions in a single run of "
+    + "the test suite. Requires --select-tests. Failed tests are attributed to "
+    + "the mutant they cover, unclear batches are bisected.",
+)
+@click.option(
+    "--serve",
+    default=None,
+    metavar="HOST:PORT",
+    help="Do not test mutants locally, but hand them out to workers started with "
+    + "`mutator test-worker --connect HOST:PORT`.",
+)
+@click.option(
+    "--lease-grace",
+    type=float,
+    default=60.0,
+    show_default=True,
+    help="Seconds a worker may exceed the timeout of a mutant before the mutant "
+    + "is handed out to another worker.",
+)
 @timed
-def test(out_dir, project, filter, timeout, git_reset, test_dropped, jobs):
+def test(
+    out_dir,
+    project,
+    filter,
+    timeout,
+    timeout_factor,
+    min_timeout,
+    git_reset,
+    test_dropped,
+    test_subsumed,
+    jobs,
+    chunk_size,
+    mode,
+    worker_recycle,
+    select_tests,
+    rebuild_test_index,
+    sandbox,
+    sandbox_ignore,
+    resume,
+    incremental,
+    since,
+    dedup,
+    cache,
+    fail_fast,
+    logs,
+    max_memory,
+    max_cpu,
+    max_processes,
+    batch_size,
+    serve,
+    lease_grace,
+):
+    if sandbox == "none" and git_reset:
+        print("error: --git-reset can not be used with --sandbox none.")
+        return 1
+    if batch_size > 1 and not select_tests:
+        print("error: --batch-size requires --select-tests.")
+        return 1
+    if batch_size > 1 and serve is not None:
+        print("error: --batch-size can not be used with --serve.")
+        return 1
+
     tempdir = tempfile.mkdtemp(prefix="mutator-test")
 
+    setup_project = pathlib.Path(tempdir, "setup")
+    if select_tests or timeout_factor is not None:
+        setup_project = create_sandbox(sandbox, project, setup_project, sandbox_ignore)
+
+    test_index = None
+    if select_tests:
+        test_index_path = out_dir / "test-index.json"
+        project_hash = hash_project(project)
+        if not rebuild_test_index and test_index_path.is_file():
+            test_index = TestIndex.read(test_index_path)
+            if test_index.project_hash != project_hash:
+                print("project changed since building the test index, rebuild it")
+                test_index = None
+        if test_index is None:
+            try:
+                coverage = collect_coverage(setup_project)
+                test_index = TestIndex.build(coverage, project, project_hash)
+                test_index.write(test_index_path)
+            except CoverageFailed as e:
+                print("warning: coverage pass failed, run all tests:", *e.args)
+                test_index = None
+
+    baseline = None
+    if timeout_factor is not None:
+        duration, exit_code = measure_baseline(setup_project)
+        if exit_code != 0:
+            print("warning: unmutated test suite failed with exit code", exit_code)
+        baseline = Baseline(
+            duration,
+            timeout_factor,
+            min_timeout,
+            timeout,
+            None if test_index is None else test_index.durations,
+        )
+        print(f"baseline: test suite took {duration:2.4f} seconds")
+
     filters = Filter(filter)
 
+    bytecode_cache = None
+    if cache is not None:
+        bytecode_cache = BytecodeCache(cache, hash_project(project, ("tests",)))
+    cache_keys = {}
+
     mutants = {}
     store = MutantStore(out_dir)
+    source_root = project.joinpath("src")
     for module, target, path, source, metadata in store.list_mutants():
         if not test_dropped and metadata.get("dropped", False):
             continue
+        if not test_subsumed and "subsumed_by" in metadata:
+            continue
         if module not in mutants:
             mutants[module] = {}
         if target not in mutants[module]:
             mutants[module][target] = []
-        mutants[module][target].append((path, source))
+        content = read_mutant(path, source_root)
+        mutants[module][target].append((path, source, hash_content(content)))
+        if bytecode_cache is not None:
+            cache_keys[path] = mutant_key(
+                content, metadata["mutant"], metadata["start"]
+            )
+
+    def relative(mutant: pathlib.Path) -> pathlib.Path:
+        return mutant.absolute().relative_to(out_dir.resolve())
+
+    equivalent, duplicates = [], {}
+    if dedup:
+        equivalent, duplicates = deduplicate(mutants, source_root)
+    duplicate_count = sum(len(entries) for entries in duplicates.values())
 
     result = Result()
+    result.project_hash = hash_project(project)
+    if baseline is not None:
+        result.baseline = baseline.to_dict()
 
-    targets = [
-        (
-            tempdir,
-            project,
-            timeout,
-            git_reset,
-            module_name,
-            target_name,
-            i,
-            mutant,
-            source,
-        )
-        for module_name, module in mutants.items()
-        for target_name, target in sorted(list(module.items()), key=lambda v: v[0])
-        for i, (mutant, source) in enumerate(target)
-        if filters.should_include(f"{module_name}:{target_name}")
-    ]
+    previous = None
+    if (out_dir / "test-result.json").is_file():
+        previous = Result(out_dir / "test-result.json")
+
+    first = {}
+    if fail_fast and previous is not None:
+        first = kill_order(previous.modules)
+
+    journal = Journal(out_dir / "test-journal.jsonl")
+    if resume:
+        for module_name, target_name, mutant_name, entry in journal.entries():
+            result.insert_entry(module_name, target_name, mutant_name, entry)
+        result.add_tests(journal.tests())
+    else:
+        journal.clear()
+
+    if (
+        incremental
+        and previous is not None
+        and previous.project_hash == result.project_hash
+    ):
+        result.add_tests(previous.tests)
+        for module_name, module in mutants.items():
+            for target_name, target in module.items():
+                for mutant, _, file_hash in target:
+                    entry = previous.get(module_name, target_name, mutant.stem)
+                    if entry is None or entry.get("hash") != file_hash:
+                        continue
+                    if result.get(module_name, target_name, mutant.stem) is None:
+                        result.insert_entry(
+                            module_name, target_name, mutant.stem, entry
+                        )
+                        journal.append(module_name, target_name, mutant.stem, entry)
+
+    if since is not None and previous is not None:
+        source_root = project.joinpath("src").resolve()
+        changed = set()
+        deleted = set()
+        for path, ranges in changed_lines(project, since).items():
+            if not source_root.joinpath(path).is_file():
+                deleted.add(str(path))
+            else:
+                source_file = SourceFile(
+                    source_root, source_root / path, Filter(["*"]), ranges
+                )
+                for changed_target in source_file.targets:
+                    changed.add(f"{source_file.module}:{changed_target.fullname}")
+        for module_name, module in mutants.items():
+            for target_name, target in module.items():
+                if f"{module_name}:{target_name}" in changed:
+                    continue
+                for mutant, source, file_hash in target:
+                    entry = previous.get(module_name, target_name, mutant.stem)
+                    if entry is None or source in deleted:
+                        continue
+                    if result.get(module_name, target_name, mutant.stem) is None:
+                        entry = {**entry, "hash": file_hash}
+                        result.insert_entry(
+                            module_name, target_name, mutant.stem, entry
+                        )
+                        journal.append(module_name, target_name, mutant.stem, entry)
+
+    def insert_duplicates(representative: pathlib.Path, entry: dict):
+        for module_name, target_name, mutant, _, file_hash in duplicates.pop(
+            representative, []
+        ):
+            duplicate = {
+                **entry,
+                "file": f"{relative(mutant)}",
+                "hash": file_hash,
+                "duplicate_of": entry["file"],
+            }
+            result.insert_entry(module_name, target_name, mutant.stem, duplicate)
+            journal.append(module_name, target_name, mutant.stem, duplicate)
+
+    for module_name, target_name, mutant, source, file_hash in equivalent:
+        if not filters.should_include(f"{module_name}:{target_name}"):
+            continue
+        if result.get(module_name, target_name, mutant.stem) is None:
+            entry = result.insert(
+                module_name,
+                target_name,
+                mutant.stem,
+                relative(mutant),
+                source,
+                False,
+                False,
+                False,
+                "<equivalent to source>",
+                file_hash=file_hash,
+            )
+            entry["equivalent"] = True
+            journal.append(module_name, target_name, mutant.stem, entry)
+    compile_errors = 0
+    for module_name, module in mutants.items():
+        for target_name, target in module.items():
+            for mutant, source, file_hash in target:
+                if result.get(module_name, target_name, mutant.stem) is not None:
+                    continue
+                if not filters.should_include(f"{module_name}:{target_name}"):
+                    continue
+                error = syntax_error(read_mutant(mutant, source_root), str(mutant))
+                if error is None:
+                    continue
+                entry = result.insert(
+                    module_name,
+                    target_name,
+                    mutant.stem,
+                    relative(mutant),
+                    source,
+                    True,
+                    True,
+                    False,
+                    error,
+                    file_hash=file_hash,
+                )
+                journal.append(module_name, target_name, mutant.stem, entry)
+                compile_errors += 1
+
+    for module_name, module in mutants.items():
+        for target_name, target in module.items():
+            for mutant, _, file_hash in target:
+                entry = result.get(module_name, target_name, mutant.stem)
+                key = cache_keys.get(mutant)
+                if entry is None and key is not None:
+                    entry = bytecode_cache.get(module_name, target_name, key)
+                    if entry is not None and not _cacheable(entry):
+                        entry = None
+                    if entry is not None:
+                        entry = {
+                            **entry,
+                            "file": f"{relative(mutant)}",
+                            "hash": file_hash,
+                            "cached": True,
+                        }
+                        result.insert_entry(
+                            module_name, target_name, mutant.stem, entry
+                        )
+                        journal.append(module_name, target_name, mutant.stem, entry)
+                if entry is not None:
+                    insert_duplicates(mutant, entry)
+
+    def selected_tests(module_name: str, target_name: str) -> list[str] | None:
+        if test_index is None:
+            return None
+        return test_index.tests_for(module_name, target_name)
+
+    def time_limit(tests: list[str] | None) -> float:
+        if baseline is None:
+            return timeout
+        return baseline.timeout(tests)
+
+    limits = {"memory": max_memory, "cpu": max_cpu, "processes": max_processes}
+    cost_model = CostModel(None if previous is None else previous.modules)
+    targets = []
+    costs = []
+    for module_name, module in mutants.items():
+        for target_name, target in sorted(list(module.items()), key=lambda v: v[0]):
+            if not filters.should_include(f"{module_name}:{target_name}"):
+                continue
+            tests = selected_tests(module_name, target_name)
+            mutant_timeout = time_limit(tests)
+            estimate = None if baseline is None else baseline.expected(tests)
+            cost = cost_model.cost(module_name, target_name, estimate, mutant_timeout)
+            for i, (mutant, source, file_hash) in enumerate(target):
+                if result.get(module_name, target_name, mutant.stem) is not None:
+                    continue
+                targets.append(
+                    _Job(
+                        tmp_dir=tempdir,
+                        project=project,
+                        sandbox=sandbox,
+                        sandbox_ignore=sandbox_ignore,
+                        timeout=mutant_timeout,
+                        git_reset=git_reset,
+                        mode=mode,
+                        recycle=worker_recycle,
+                        fail_fast=fail_fast,
+                        module_name=module_name,
+                        target_name=target_name,
+                        index=i,
+                        mutant=mutant,
+                        source=source,
+                        tests=tests,
+                        first=first.get(f"{module_name}:{target_name}", [])[
+                            :_MAX_FIRST
+                        ],
+                        file_hash=file_hash,
+                        limits=limits,
+                        expected=estimate,
+                    )
+                )
+                costs.append(cost)
+    targets = longest_first(targets, costs)
+    batches = [[x] for x in targets]
+    if batch_size > 1:
+        originals = {}
+        items = []
+        for job in targets:
+            source = job.source
+            if source not in originals:
+                original = project.joinpath("src", source)
+                originals[source] = (
+                    original.read_bytes() if original.is_file() else None
+                )
+            if originals[source] is None:
+                items.append((None, source, (0, 0)))
+                continue
+            start, end, _ = patch_region(
+                originals[source], read_mutant(job.mutant, source_root)
+            )
+            items.append((job.tests, source, (start, end)))
+        batches = [
+            [targets[i] for i in batch] for batch in plan_batches(items, batch_size)
+        ]
+        print(f"batches: {len(batches)} for {len(targets)} mutants")
     timeout_count = 0
     syntax_error_count = 0
     dead = 0
@@ -174,9 +1036,20 @@ def test(out_dir, project, filter, timeout, git_reset, test_dropped, jobs):
             end="\r",
         )
 
-    with multiprocessing.Pool(processes=jobs) as p:
+    if serve is None:
+        pool = multiprocessing.Pool(processes=jobs)
+        results = itertools.chain.from_iterable(
+            pool.imap_unordered(_run_batch, batches, chunksize=chunk_size)
+        )
+    else:
+        pool = contextlib.nullcontext()
+        results = (
+            (result, False)
+            for result in _serve_targets(serve, lease_grace, source_root, targets)
+        )
+    with pool:
         i = 0
-        for x in p.imap(_run_tester, targets):
+        for x, is_batched in results:
             (
                 module_name,
                 target_name,
@@ -186,20 +1059,57 @@ def test(out_dir, project, filter, timeout, git_reset, test_dropped, jobs):
                 is_syntax_error,
                 is_timeout,
                 output,
+                mutant_timeout,
+                file_hash,
+                duration,
+                max_rss,
+                cpu_time,
+                report,
             ) = x
             status_update(f"{module_name}:{target_name}", i)
-            result.insert(
+            killed_by = None
+            if is_dead and not is_timeout:
+                killed_by = killing_tests(report, output)
+            is_killed = is_dead and not is_syntax_error and not is_timeout
+            if logs == "compressed":
+                log = pathlib.Path(
+                    "logs", module_name, target_name, f"{mutant.stem}.log.gz"
+                )
+                out_dir.joinpath(log).parent.mkdir(parents=True, exist_ok=True)
+                out_dir.joinpath(log).write_bytes(gzip.compress(output.encode()))
+            if is_killed and logs != "all" and len(killed_by) > 0:
+                output = _summarize(output, killed_by)
+            entry = result.insert(
                 module_name,
                 target_name,
                 mutant.stem,
-                mutant.absolute().relative_to(out_dir.resolve("./mutants")),
+                relative(mutant),
                 source,
                 is_dead,
                 is_syntax_error,
                 is_timeout,
                 output,
+                killed_by,
+                mutant_timeout if baseline is not None else None,
+                file_hash,
+                duration,
+                max_rss,
+                cpu_time,
+                report,
             )
-            if is_dead and not is_syntax_error and not is_timeout:
+            if logs == "compressed":
+                entry["log"] = f"{log}"
+            # Kill matrices need to know whether `killed_by` may be incomplete.
+            if fail_fast:
+                entry["fail_fast"] = True
+            if is_batched:
+                entry["batched"] = True
+            new_tests = result.add_tests(report or {})
+            journal.append(module_name, target_name, mutant.stem, entry, new_tests)
+            insert_duplicates(mutant, entry)
+            if cache_keys.get(mutant) is not None and _cacheable(entry):
+                bytecode_cache.put(module_name, target_name, cache_keys[mutant], entry)
+            if is_killed:
                 dead += 1
             if is_syntax_error:
                 syntax_error_count += 1
@@ -207,5 +1117,97 @@ def test(out_dir, project, filter, timeout, git_reset, test_dropped, jobs):
                 timeout_count += 1
             i += 1
     print()
+    print(f"syntax errors found without testing: {compile_errors}")
+    if dedup:
+        print(f"equivalent: {len(equivalent)} duplicates: {duplicate_count}")
     result.write(out_dir / "test-result.json")
+    if bytecode_cache is not None:
+        bytecode_cache.write()
+    shutil.rmtree(tempdir)
+
+
+@click.command(
+    "test-worker", help="Tests mutants handed out by `mutator test --serve`."
+)
+@click.option(
+    "--connect",
+    required=True,
+    metavar="HOST:PORT",
+    help="Address of the coordinator.",
+)
+@click.option(
+    "-p",
+    "--project",
+    default=pathlib.Path("."),
+    type=pathlib.Path,
+    show_default=True,
+    help="Path to the local copy of the project to run tests on.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=int,
+    default=4,
+    help="Number of parallel jobs to execut in parallel",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(["subprocess", "worker", "fork"]),
+    default="subprocess",
+    show_default=True,
+    help="See `mutator test --mode`.",
+)
+@click.option(
+    "--worker-recycle",
+    type=int,
+    default=50,
+    show_default=True,
+    help="Restart a worker after testing this many mutants.",
+)
+@click.option(
+    "--sandbox",
+    type=click.Choice(["copy", "link", "none"]),
+    default="copy",
+    show_default=True,
+    help="See `mutator test --sandbox`.",
+)
+@click.option(
+    "--sandbox-ignore",
+    multiple=True,
+    default=["out"],
+    show_default=True,
+    help="Glob of files and directories not to include in the sandbox.",
+)
+@click.option(
+    "--git-reset",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Run git reset --hard before each run of the test suite.",
+)
+def test_worker(
+    connect, project, jobs, mode, worker_recycle, sandbox, sandbox_ignore, git_reset
+):
+    if sandbox == "none" and git_reset:
+        print("error: --git-reset can not be used with --sandbox none.")
+        return 1
+
+    tempdir = tempfile.mkdtemp(prefix="mutator-worker")
+    options = (
+        tempdir,
+        project,
+        sandbox,
+        sandbox_ignore,
+        git_reset,
+        mode,
+        worker_recycle,
+    )
+    url = f"http://{connect}"
+    processes = [
+        multiprocessing.Process(target=_work, args=(url, options)) for _ in range(jobs)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
     shutil.rmtree(tempdir)
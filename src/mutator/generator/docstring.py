@@ -1,6 +1,5 @@
 import tree_sitter as ts
 
-from ..helper.tries import tries
 from ..source import MutantTarget
 from ..treesitter.context import Context
 from .config import GeneratorConfig
@@ -31,11 +30,11 @@ class DocstringGenerator(SimpleMutantGenerator):
         except NoMutantPossible:
             return []
 
-        def generate():
-            return mutator.ai.llm.llm.prompt(
+        return Mutant.map(
+            mutator.ai.llm.llm.prompt_tries(
                 prompt,
                 transform_result=trim_prompt(to_trim),
+                tries=config.tries_per_target,
                 **config.model_kwargs,
             )
-
-        return Mutant.map(tries(config.tries_per_target, generate))
+        )
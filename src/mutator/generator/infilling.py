@@ -56,7 +56,8 @@ class InfillingGenerator(MutantGenerator):
                     ranges.add(node.byte_range)
         targets.difference_update(exclude)
         targets = list(targets)
-        results = []
+        prompts = []
+        transforms = []
         for start_byte, end_byte in random.sample(
             targets, min(config.tries_per_target, len(targets))
         ):
@@ -64,12 +65,12 @@ class InfillingGenerator(MutantGenerator):
                 target.node, start_byte, end_byte
             )
 
-            def transform(result: str) -> str:
-                return prefix + result[len(prompt) :] + suffix  # noqa: B023
+            def transform(result: str, prompt=prompt, prefix=prefix, suffix=suffix):
+                return prefix + result[len(prompt) :] + suffix
 
-            results += mutator.ai.llm.llm.prompt(
-                prompt,
-                transform_result=transform,
-                **config.model_kwargs,
-            )
-        return Mutant.map(results)
+            prompts.append(prompt)
+            transforms.append(transform)
+        results = mutator.ai.llm.llm.prompt_batch(
+            prompts, transforms, **config.model_kwargs
+        )
+        return Mutant.map([result for results in results for result in results])
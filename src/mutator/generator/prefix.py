@@ -1,6 +1,5 @@
 import tree_sitter as ts
 
-from ..helper.tries import tries
 from ..source import MutantTarget
 from ..treesitter.context import Context
 from .config import GeneratorConfig
@@ -22,16 +21,16 @@ class PrefixGenerator(MutantGenerator):
         docstring = context.docstring()
         docstring_len = len(docstring.text.decode()) if docstring else 0
 
-        def generate():
-            prompt = definition + indent + target.content().decode()
-            return mutator.ai.llm.llm.prompt_with_random_prefix(
+        prompt = definition + indent + target.content().decode()
+        return Mutant.map(
+            mutator.ai.llm.llm.prompt_with_random_prefix(
                 prompt,
                 transform_result=trim_prompt(definition + indent),
                 keep_prefix_len=len(definition)
                 + len(indent)
                 + len(signature)
                 + docstring_len,
+                count=config.tries_per_target,
                 **config.model_kwargs,
             )
-
-        return Mutant.map(tries(config.tries_per_target, generate))
+        )
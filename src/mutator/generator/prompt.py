@@ -1,7 +1,6 @@
 import autopep8
 import tree_sitter as ts
 
-from ..helper.tries import tries
 from ..source import MutantTarget
 from ..treesitter.context import Context
 from .config import GeneratorConfig
@@ -49,8 +48,11 @@ class Prompt(SimpleMutantGenerator):
         def transform(result: str) -> str:
             return result[strip_len:]
 
-        results = mutator.ai.llm.llm.prompt(
-            prompt, transform_result=transform, **config.model_kwargs
+        results = mutator.ai.llm.llm.prompt_tries(
+            prompt,
+            transform_result=transform,
+            tries=config.tries_per_target,
+            **config.model_kwargs,
         )
 
         def add_indent(input: str) -> str:
@@ -61,7 +63,4 @@ class Prompt(SimpleMutantGenerator):
                 ]
             )[indent:]
 
-        def generate():
-            return [Mutant(add_indent(result.final), result) for result in results]
-
-        return tries(config.tries_per_target, generate)
+        return [Mutant(add_indent(result.final), result) for result in results]
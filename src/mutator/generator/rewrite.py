@@ -1,6 +1,5 @@
 import tree_sitter as ts
 
-from ..helper.tries import tries
 from ..source import MutantTarget
 from ..treesitter.context import Context
 from .config import GeneratorConfig
@@ -52,14 +51,14 @@ class CommentRewriteNoContextGenerator(SimpleMutantGenerator):
             **config.model_kwargs,
         }
 
-        def generate():
-            return mutator.ai.llm.llm.prompt(
+        return Mutant.map(
+            mutator.ai.llm.llm.prompt_tries(
                 prompt,
                 transform_result=transform,
+                tries=config.tries_per_target,
                 **model_kwargs,
             )
-
-        return Mutant.map(tries(config.tries_per_target, generate))
+        )
 
 
 class CommentRewriteGenerator(CommentRewriteNoContextGenerator):
@@ -0,0 +1,60 @@
+import pathlib
+import re
+
+import git
+
+_hunk_pattern = re.compile(r"^@@ -\S+ \+(\d+)(?:,(\d+))? @@", re.MULTILINE)
+
+
+def _ranges(diff: str) -> list[tuple[int, int]]:
+    ranges = []
+    for start, count in _hunk_pattern.findall(diff):
+        start = int(start)
+        count = 1 if count == "" else int(count)
+        if count == 0:
+            # Pure deletion after line `start`, affects both surrounding lines.
+            ranges.append((max(start, 1), start + 1))
+        else:
+            ranges.append((start, start + count - 1))
+    return ranges
+
+
+def changed_lines(
+    project: pathlib.Path, rev: str
+) -> dict[pathlib.Path, list[tuple[int, int]]]:
+    """
+    Returns the changed line ranges (1-based, inclusive) of each python source
+    file in the `src` directory of `project` between `rev` and the working tree,
+    including untracked files. Paths are relative to the `src` directory.
+    Deleted files are mapped onto an empty list of ranges.
+    """
+    repo = git.Repo(project, search_parent_directories=True)
+    root = pathlib.Path(repo.working_tree_dir).resolve()
+    source_root = project.joinpath("src").resolve()
+
+    def relative(path: str) -> pathlib.Path | None:
+        path = root / path
+        if path.suffix != ".py" or not path.is_relative_to(source_root):
+            return None
+        return path.relative_to(source_root)
+
+    changes = {}
+    names = repo.git.diff(
+        rev, "--name-status", "--no-renames", "--diff-filter=ACMRD", "--", source_root
+    )
+    for line in names.splitlines():
+        status, name = line.split("\t", 1)
+        path = relative(name)
+        if path is None:
+            continue
+        if status == "D":
+            changes[path] = []
+            continue
+        diff = repo.git.diff(rev, "--unified=0", "--no-color", "--", root / name)
+        changes[path] = _ranges(diff)
+    for name in repo.untracked_files:
+        path = relative(name)
+        if path is not None:
+            lines = len(source_root.joinpath(path).read_bytes().splitlines())
+            changes[path] = [(1, max(lines, 1))]
+    return changes
@@ -1,4 +1,5 @@
 import difflib
+import gzip
 import json
 import pathlib
 
@@ -11,6 +12,7 @@ from textual.widget import Widget
 from textual.widgets import Button, Input, ListItem, ListView, Pretty, Static, TextArea
 
 from ..result import Result
+from ..store import read_mutant
 
 
 class Target(ListItem):
@@ -133,7 +135,10 @@ class TargetDiff(TextArea):
     def get_diff(self, target):
         file = self.out_dir / target["file"]
         file_lines = list(
-            map(lambda line: line.decode(), file.read_bytes().splitlines(True))
+            map(
+                lambda line: line.decode(),
+                read_mutant(file, self.base_dir / "src").splitlines(True),
+            )
         )
         source = self.base_dir / "src" / target["source"]
         source_lines = list(
@@ -158,11 +163,16 @@ class TargetDiff(TextArea):
 
 
 class TargetLog(TextArea):
-    def __init__(self, **kwargs):
+    def __init__(self, out_dir: pathlib.Path, **kwargs):
         super().__init__("", read_only=True, **kwargs)
+        self.out_dir = out_dir
 
     def update(self, target):
-        self.load_text(target["output"])
+        log = self.out_dir / target.get("log", "")
+        if "log" in target and log.is_file():
+            self.load_text(gzip.decompress(log.read_bytes()).decode())
+        else:
+            self.load_text(target["output"])
 
 
 class TargetInfo(Widget):
@@ -193,7 +203,7 @@ class TargetView(Widget):
         super().__init__(**kwargs)
         self._header = TargetHeader(classes="target-header")
         self._content = TargetDiff(base_dir, out_dir, classes="target-diff")
-        self._log = TargetLog(classes="target-log")
+        self._log = TargetLog(out_dir, classes="target-log")
         self._info = TargetInfo(out_dir, classes="target-info")
         self._annotation_editor = Input(
             value="", name="annotation", classes="annotation-input valid"
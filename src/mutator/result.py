@@ -1,26 +1,69 @@
 import json
 import pathlib
+import typing
+
+
+def compact_report(report: dict[str, list]) -> tuple[dict[str, list], int, float]:
+    """
+    Reduces a test report (see `mutator_runner.report`) to the tests that did
+    not pass. Returns them, the number of passed tests and the total duration.
+    """
+    failed = {test: entry for test, entry in report.items() if entry[0] != "passed"}
+    duration = round(sum(entry[1] for entry in report.values()), 6)
+    return failed, len(report) - len(failed), duration
 
 
 class Result:
+    """
+    Test results of all mutants. The ids of all executed tests are stored once
+    as `tests`, the entry of each mutant only lists the tests that did not pass.
+    """
+
     def __init__(self, path: pathlib.Path | None = None):
         if path is not None:
             data = json.loads(path.read_bytes())
             if "modules" not in data:
                 raise Exception("missing key 'modules' in result file")
             self.modules = data["modules"]
+            self.baseline = data.get("baseline")
+            self.project_hash = data.get("project_hash")
+            self.tests = dict.fromkeys(data.get("tests", []))
         else:
             self.modules = {}
+            self.baseline = None
+            self.project_hash = None
+            self.tests = {}
 
     def write(self, path: pathlib.Path):
-        data = {"modules": self.modules}
+        data = {"modules": self.modules, "tests": list(self.tests)}
+        if self.baseline is not None:
+            data["baseline"] = self.baseline
+        if self.project_hash is not None:
+            data["project_hash"] = self.project_hash
         path.write_bytes(json.dumps(data).encode())
 
+    def add_tests(self, tests: typing.Iterable[str]) -> list[str]:
+        "Records executed tests. Returns the ones not recorded before."
+        new = [test for test in tests if test not in self.tests]
+        self.tests.update(dict.fromkeys(new))
+        return new
+
     def read(path: pathlib.Path):
         if not path.is_file():
             return None
         return json.load(open(path))["modules"]
 
+    def get(self, module: str, symbol: str, mutant: str) -> dict | None:
+        return self.modules.get(module, {}).get(symbol, {}).get(mutant)
+
+    def insert_entry(self, module: str, symbol: str, mutant: str, entry: dict):
+        if module not in self.modules:
+            self.modules[module] = {}
+        if symbol not in self.modules[module]:
+            self.modules[module][symbol] = {}
+        if mutant not in self.modules[module][symbol]:
+            self.modules[module][symbol][mutant] = entry
+
     def insert(
         self,
         module: str,
@@ -32,17 +75,93 @@ class Result:
         is_syntax_error: bool,
         is_timeout: bool,
         output: str,
+        killed_by: list[str] | None = None,
+        time_limit: float | None = None,
+        file_hash: str | None = None,
+        duration: float | None = None,
+        max_rss: int | None = None,
+        cpu_time: float | None = None,
+        report: dict[str, list] | None = None,
+    ) -> dict:
+        entry = {
+            "file": f"{file}",
+            "dead": is_dead,
+            "syntax_error": is_syntax_error,
+            "source": source,
+            "timeout": is_timeout,
+            "output": output,
+        }
+        if time_limit is not None:
+            entry["time_limit"] = time_limit
+        if killed_by is not None:
+            entry["killed_by"] = killed_by
+        if file_hash is not None:
+            entry["hash"] = file_hash
+        if duration is not None:
+            entry["duration"] = duration
+        if max_rss is not None:
+            entry["max_rss"] = max_rss
+        if cpu_time is not None:
+            entry["cpu_time"] = cpu_time
+        if report is not None:
+            entry["tests"], entry["passed"], entry["test_duration"] = compact_report(
+                report
+            )
+        self.insert_entry(module, symbol, mutant, entry)
+        return entry
+
+
+class Journal:
+    """
+    Append-only log of the results of a running test session. Allows to resume
+    an interrupted session, as `Result` is only written after all mutants are
+    tested.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+
+    def clear(self):
+        self.path.write_bytes(b"")
+
+    def _records(self) -> typing.Generator[dict, None, None]:
+        if not self.path.is_file():
+            return
+        with open(self.path) as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be incomplete after an interruption.
+                    continue
+
+    def entries(self) -> typing.Generator[tuple[str, str, str, dict], None, None]:
+        for record in self._records():
+            yield (
+                record["module"],
+                record["symbol"],
+                record["mutant"],
+                record["entry"],
+            )
+
+    def tests(self) -> list[str]:
+        "Returns the executed tests recorded alongside the entries."
+        return [test for record in self._records() for test in record.get("tests", [])]
+
+    def append(
+        self,
+        module: str,
+        symbol: str,
+        mutant: str,
+        entry: dict,
+        tests: list[str] | None = None,
     ):
-        if module not in self.modules:
-            self.modules[module] = {}
-        if symbol not in self.modules[module]:
-            self.modules[module][symbol] = {}
-        if mutant not in self.modules[module][symbol]:
-            self.modules[module][symbol][mutant] = {
-                "file": f"{file}",
-                "dead": is_dead,
-                "syntax_error": is_syntax_error,
-                "source": source,
-                "timeout": is_timeout,
-                "output": output,
-            }
+        """
+        Records the `entry` of a mutant and the executed `tests` not recorded
+        with a previous entry.
+        """
+        record = {"module": module, "symbol": symbol, "mutant": mutant, "entry": entry}
+        if tests:
+            record["tests"] = tests
+        with open(self.path, "a") as file:
+            file.write(json.dumps(record) + "\n")
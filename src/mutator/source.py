@@ -19,6 +19,14 @@ class MissingIdentifier(Exception):
     "Raised when a tree sitter expects an identifier but no one was found"
 
 
+def _overlaps(node: ts.Node, ranges: list[tuple[int, int]]) -> bool:
+    if node.parent is not None and node.parent.type == "decorated_definition":
+        node = node.parent
+    start = node.start_point[0] + 1
+    end = node.end_point[0] + 1
+    return any(a <= end and start <= b for a, b in ranges)
+
+
 class Symbol:
     def __init__(self, content: bytes, node: ts.Node):
         if node.type != "function_definition":
@@ -40,10 +48,18 @@ class Symbol:
 
 class SourceFile:
     """
-    Stores all information associated with a python source file.
+    Stores all information associated with a python source file. If `changed`
+    line ranges (1-based, inclusive) are given, only functions overlapping them
+    are targets.
     """
 
-    def __init__(self, root: pathlib.Path, path: pathlib.Path, filter: Filter):
+    def __init__(
+        self,
+        root: pathlib.Path,
+        path: pathlib.Path,
+        filter: Filter,
+        changed: list[tuple[int, int]] | None = None,
+    ):
         self.path = path.relative_to(root)
 
         self.module = self.path.stem
@@ -59,8 +75,11 @@ class SourceFile:
         lines = self.content.splitlines(keepends=True)
         for _, captures in _tsFunctionQuery.matches(self.tree.root_node):
             symbol = Symbol(self.content, captures["target"])
-            if filter.should_include(f"{self.module}:{symbol.name}"):
-                self.symbols.append(symbol)
+            if not filter.should_include(f"{self.module}:{symbol.name}"):
+                continue
+            if changed is not None and not _overlaps(symbol.node, changed):
+                continue
+            self.symbols.append(symbol)
         self.targets = [MutantTarget(self, lines, symbol) for symbol in self.symbols]
 
 
@@ -77,6 +96,10 @@ class MutantTarget:
     def content(self) -> bytes:
         return self.source.content[self.node.start_byte : self.node.end_byte]
 
+    def overlaps(self, ranges: list[tuple[int, int]]) -> bool:
+        "Returns whether this target overlaps any of the line ranges."
+        return _overlaps(self.node, ranges)
+
     def get_name(self) -> bytes:
         return self.node.child_by_field_name("name").text
 
@@ -1,23 +1,48 @@
+import hashlib
 import json
 import os
 import pathlib
+import shutil
 import typing
 from dataclasses import asdict
 
 from .ai.llm_stats import LLMStats
 from .generator import GeneratorConfig, Mutant
-from .source import MutantTarget
+from .helper.pattern import Filter
+from .source import MutantTarget, SourceFile
+
+
+def read_mutant(path: pathlib.Path, source_root: pathlib.Path) -> bytes:
+    """
+    Returns the content of the mutated source file `path`. Mutants stored
+    without a copy of their source file are reconstructed from the source file
+    in `source_root` and the byte range recorded in their metadata.
+    """
+    if path.is_file():
+        return path.read_bytes()
+    metadata = json.load(open(path.with_suffix(".json")))
+    original = source_root.joinpath(metadata["file"]).read_bytes()
+    if hashlib.sha256(original).hexdigest() != metadata.get("source_hash"):
+        raise Exception(f"{path}: source file changed since generating the mutant")
+    return (
+        original[: metadata["start_byte"]]
+        + metadata["mutant"].encode()
+        + original[metadata["end_byte"] :]
+    )
 
 
 class MutantStore:
     """
-    Manage the filesystem storage of all mutants.
+    Manage the filesystem storage of all mutants. Unless `copies` is unset, a
+    full copy of the mutated source file is stored next to the metadata of each
+    mutant. Use `read_mutant` to read the content of a mutant.
     """
 
-    def __init__(self, out: pathlib.Path):
+    def __init__(self, out: pathlib.Path, copies: bool = True):
         self.base = out
         self.base.mkdir(parents=True, exist_ok=True)
         self.counter = {}
+        self.copies = copies
 
     def add(
         self,
@@ -55,6 +80,9 @@ class MutantStore:
                 "mutant": mutant.content.decode(),
                 "start": target.node.start_point,
                 "end": target.node.end_point,
+                "start_byte": target.node.start_byte,
+                "end_byte": target.node.end_byte,
+                "source_hash": hashlib.sha256(target.source.content).hexdigest(),
                 "model_or_checkpoint": str(model_or_checkpoint),
                 "generator": generator,
                 "config_name": config_name,
@@ -65,7 +93,8 @@ class MutantStore:
             },
             open(path / f"{self.counter[path]}.json", "w"),
         )
-        (path / f"{self.counter[path]}.py").write_bytes(content)
+        if self.copies:
+            (path / f"{self.counter[path]}.py").write_bytes(content)
 
     def isclean(self) -> bool:
         try:
@@ -85,10 +114,55 @@ class MutantStore:
             for target in os.listdir(module_path):
                 target_path = module_path / target
                 for file in os.listdir(target_path):
-                    if file.endswith(".py"):
-                        metadata = json.load(
-                            open((target_path / file).with_suffix(".json"))
-                        )
+                    if file.endswith(".json"):
+                        metadata = json.load(open(target_path / file))
                         source_file = metadata["file"]
-                        file_path = target_path.joinpath(file)
+                        file_path = target_path.joinpath(file).with_suffix(".py")
                         yield module, target, file_path, source_file, metadata
+
+    def rebase(
+        self, source_root: pathlib.Path, changes: dict[pathlib.Path, list[tuple]]
+    ) -> int:
+        """
+        Updates the mutants of the source files in `changes` (see
+        `helper.changes.changed_lines`). Mutants of changed or removed functions
+        are removed. All other mutants are moved onto the new version of their
+        source file. Returns the number of removed mutants.
+        """
+        sources = {}
+        removed = set()
+        count = 0
+        for _, target, path, source, metadata in list(self.list_mutants()):
+            source = pathlib.Path(source)
+            if source not in changes:
+                continue
+            if source not in sources:
+                file = source_root / source
+                sources[source] = {}
+                if file.is_file():
+                    source_file = SourceFile(source_root, file, Filter(["*"]))
+                    for t in source_file.targets:
+                        sources[source][t.fullname] = t
+            new_target = sources[source].get(target)
+            if new_target is None or new_target.overlaps(changes[source]):
+                removed.add(path.parent)
+                count += 1
+                continue
+            content = new_target.source.content
+            if path.is_file():
+                path.write_bytes(
+                    content[: new_target.node.start_byte]
+                    + metadata["mutant"].encode()
+                    + content[new_target.node.end_byte :]
+                )
+            metadata["start"] = new_target.node.start_point
+            metadata["end"] = new_target.node.end_point
+            metadata["start_byte"] = new_target.node.start_byte
+            metadata["end_byte"] = new_target.node.end_byte
+            metadata["source_hash"] = hashlib.sha256(content).hexdigest()
+            json.dump(metadata, open(path.with_suffix(".json"), "w"))
+        for directory in removed:
+            shutil.rmtree(directory)
+            if len(os.listdir(directory.parent)) == 0:
+                directory.parent.rmdir()
+        return count
@@ -0,0 +1,47 @@
+from .baseline import Baseline, measure_baseline
+from .batch import attribute, combine, patch_region, plan_batches
+from .cache import BytecodeCache, code_hash, mutant_key
+from .distributed import Coordinator, work
+from .distributed import serve as serve_coordinator
+from .equivalence import deduplicate, normalize
+from .hashing import hash_content, hash_file, hash_project
+from .history import failed_tests, kill_order, killing_tests
+from .matrix import KillMatrix
+from .sandbox import create_sandbox
+from .schedule import CostModel, longest_first
+from .selection import CoverageFailed, TestIndex, collect_coverage
+from .syntax import syntax_error
+from .worker import RunnerWorker, WorkerCrashed
+
+__all__ = [
+    "Baseline",
+    "BytecodeCache",
+    "Coordinator",
+    "CostModel",
+    "KillMatrix",
+    "CoverageFailed",
+    "RunnerWorker",
+    "TestIndex",
+    "WorkerCrashed",
+    "attribute",
+    "code_hash",
+    "collect_coverage",
+    "combine",
+    "create_sandbox",
+    "deduplicate",
+    "failed_tests",
+    "hash_content",
+    "hash_file",
+    "hash_project",
+    "kill_order",
+    "killing_tests",
+    "longest_first",
+    "measure_baseline",
+    "mutant_key",
+    "normalize",
+    "patch_region",
+    "plan_batches",
+    "serve_coordinator",
+    "syntax_error",
+    "work",
+]
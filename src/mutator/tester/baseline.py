@@ -0,0 +1,55 @@
+import subprocess
+import time
+
+
+def measure_baseline(project) -> tuple[float, int]:
+    """
+    Runs the unmutated test suite of `project` once. Returns the wall time in
+    seconds and the exit code of pytest.
+    """
+    start = time.monotonic()
+    process = subprocess.run(
+        ["python3", "-m", "mutator_runner"], capture_output=True, cwd=project
+    )
+    return time.monotonic() - start, process.returncode
+
+
+class Baseline:
+    """
+    Derives the timeout of each mutant from the duration of the unmutated test
+    suite. If per test durations are known, the timeout of a mutant is based on
+    the startup overhead and the duration of the tests selected for it.
+    """
+
+    def __init__(
+        self,
+        duration: float,
+        factor: float,
+        min_timeout: float,
+        max_timeout: float,
+        durations: dict[str, float] | None = None,
+    ):
+        self.duration = duration
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.durations = durations or {}
+        self.overhead = max(0.0, duration - sum(self.durations.values()))
+
+    def expected(self, tests: list[str] | None) -> float:
+        if tests is None or len(self.durations) == 0:
+            return self.duration
+        return self.overhead + sum(self.durations.get(test, 0.0) for test in tests)
+
+    def timeout(self, tests: list[str] | None) -> float:
+        timeout = self.factor * self.expected(tests)
+        return min(self.max_timeout, max(self.min_timeout, timeout))
+
+    def to_dict(self) -> dict:
+        return {
+            "duration": self.duration,
+            "overhead": self.overhead,
+            "timeout_factor": self.factor,
+            "min_timeout": self.min_timeout,
+            "max_timeout": self.max_timeout,
+        }
@@ -0,0 +1,91 @@
+def _continuation(content: bytes, index: int) -> bool:
+    return index < len(content) and content[index] & 0xC0 == 0x80
+
+
+def patch_region(original: bytes, mutant: bytes) -> tuple[int, int, bytes]:
+    """
+    Returns the byte range `[start, end)` of `original` replaced by `mutant` and
+    its replacement. The range does not split UTF-8 encoded characters.
+    """
+    limit = min(len(original), len(mutant))
+    start = 0
+    while start < limit and original[start] == mutant[start]:
+        start += 1
+    suffix = 0
+    while suffix < limit - start and original[-suffix - 1] == mutant[-suffix - 1]:
+        suffix += 1
+    while start > 0 and _continuation(original, start):
+        start -= 1
+    while suffix > 0 and _continuation(original, len(original) - suffix):
+        suffix -= 1
+    return start, len(original) - suffix, mutant[start : len(mutant) - suffix]
+
+
+def _overlaps(a: tuple[int, int], b: tuple[int, int]) -> bool:
+    # Adjacent regions are rejected as well, as their order would be ambiguous.
+    return a[0] <= b[1] and b[0] <= a[1]
+
+
+def combine(original: bytes, mutants: list[bytes]) -> bytes | None:
+    """
+    Applies the changes of all `mutants` to `original`. Returns `None` if the
+    changes overlap.
+    """
+    patches = sorted(patch_region(original, mutant) for mutant in mutants)
+    for a, b in zip(patches, patches[1:], strict=False):
+        if _overlaps(a[:2], b[:2]):
+            return None
+    content = original
+    for start, end, replacement in reversed(patches):
+        content = content[:start] + replacement + content[end:]
+    return content
+
+
+def plan_batches(
+    items: list[tuple[list[str] | None, str, tuple[int, int]]], size: int
+) -> list[list[int]]:
+    """
+    Groups `items` (`(tests, source file, patch region)`) into batches of at most
+    `size` items, which can be tested in a single run. Items of a batch share no
+    test and do not overlap in their source file. Items without known tests are
+    never batched. Returns the indices of the items of each batch.
+    """
+    batches = []
+    open_batches = []
+    for index, (tests, source, region) in enumerate(items):
+        if size <= 1 or not tests:
+            batches.append([index])
+            continue
+        tests = set(tests)
+        for batch in open_batches:
+            members, covered, regions = batch
+            if not covered.isdisjoint(tests):
+                continue
+            if any(_overlaps(region, other) for other in regions.get(source, [])):
+                continue
+            members.append(index)
+            covered.update(tests)
+            regions.setdefault(source, []).append(region)
+            if len(members) >= size:
+                open_batches.remove(batch)
+            break
+        else:
+            batch = ([index], tests, {source: [region]})
+            batches.append(batch[0])
+            open_batches.append(batch)
+    return batches
+
+
+def attribute(failed: list[str], tests: list[list[str]]) -> list[list[str]] | None:
+    """
+    Assigns each failed test of a batch run to the single item of the batch it
+    covers (`tests`). Returns the killing tests per item or `None` if a failure
+    cannot be attributed to any item.
+    """
+    owners = {test: index for index, covered in enumerate(tests) for test in covered}
+    killers = [[] for _ in tests]
+    for test in failed:
+        if test not in owners:
+            return None
+        killers[owners[test]].append(test)
+    return killers
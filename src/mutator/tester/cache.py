@@ -0,0 +1,100 @@
+import ast
+import hashlib
+import json
+import pathlib
+import sys
+import textwrap
+import types
+
+from .equivalence import normalize_tree
+
+
+def _code_fingerprint(code: types.CodeType) -> tuple:
+    def const(value):
+        if isinstance(value, types.CodeType):
+            return _code_fingerprint(value)
+        if isinstance(value, frozenset):
+            return tuple(sorted(repr(v) for v in value))
+        if isinstance(value, tuple):
+            return tuple(const(v) for v in value)
+        return type(value).__name__, repr(value)
+
+    return (
+        code.co_code,
+        code.co_argcount,
+        code.co_posonlyargcount,
+        code.co_kwonlyargcount,
+        code.co_flags,
+        code.co_name,
+        code.co_names,
+        code.co_varnames,
+        code.co_freevars,
+        code.co_cellvars,
+        getattr(code, "co_exceptiontable", b""),
+        tuple(const(value) for value in code.co_consts),
+    )
+
+
+def code_hash(source: str) -> str | None:
+    """
+    Hashes the bytecode of `source` while ignoring line numbers and file names.
+    Returns `None` if `source` does not compile.
+    """
+    try:
+        tree = normalize_tree(ast.parse(textwrap.dedent(source)))
+        # Nodes created by the normalizer have no location.
+        ast.fix_missing_locations(tree)
+        code = compile(tree, "<mutant>", "exec")
+    except (SyntaxError, ValueError):
+        return None
+    fingerprint = (sys.version_info[:2], _code_fingerprint(code))
+    return hashlib.sha256(repr(fingerprint).encode()).hexdigest()
+
+
+def mutant_key(content: bytes, mutant: str, start: list[int]) -> str | None:
+    """
+    Identifies a mutant by the bytecode of the mutated function and the content
+    of the module surrounding it. `content` is the mutant file, `mutant` the
+    mutated function starting at the `(row, column)` position `start`.
+    """
+    row, column = start
+    lines = content.splitlines(keepends=True)
+    offset = sum(len(line) for line in lines[:row]) + column
+    function = mutant.encode()
+    if content[offset : offset + len(function)] != function:
+        return None
+    fingerprint = code_hash(" " * column + mutant)
+    if fingerprint is None:
+        return None
+    surrounding = hashlib.sha256()
+    surrounding.update(content[:offset])
+    surrounding.update(b"\0")
+    surrounding.update(content[offset + len(function) :])
+    return f"{surrounding.hexdigest()}:{fingerprint}"
+
+
+class BytecodeCache:
+    """
+    Persistent mapping from mutant keys (see `mutant_key`) to test results.
+    Allows to reuse results across runs and versions of a project, as long as
+    the mutated module and the tests did not change.
+    """
+
+    def __init__(self, path: pathlib.Path, tests_hash: str):
+        self.path = path
+        self.tests_hash = tests_hash
+        self.entries = {}
+        if path.is_file():
+            self.entries = json.loads(path.read_bytes())
+
+    def _key(self, module: str, target: str, key: str) -> str:
+        return f"{module}:{target}:{self.tests_hash}:{key}"
+
+    def get(self, module: str, target: str, key: str) -> dict | None:
+        return self.entries.get(self._key(module, target, key))
+
+    def put(self, module: str, target: str, key: str, entry: dict):
+        self.entries[self._key(module, target, key)] = entry
+
+    def write(self):
+        self.path.write_bytes(json.dumps(self.entries).encode())
@@ -0,0 +1,169 @@
+import http.server
+import json
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+class Coordinator:
+    """
+    Hands out work units to remote workers and collects their results. Each
+    handed out unit is leased for `timeout + grace` seconds. Units of workers
+    that do not report back in time are handed out again, up to `max_leases`
+    times in total. Afterwards the unit is recorded as failed.
+    """
+
+    def __init__(
+        self,
+        units: list[dict],
+        grace: float,
+        max_leases: int = 3,
+        clock=time.monotonic,
+    ):
+        self.units = {unit["id"]: unit for unit in units}
+        self.pending = [unit["id"] for unit in reversed(units)]
+        self.leases = {}
+        self.lease_counts = dict.fromkeys(self.units, 0)
+        self.done = set()
+        self.grace = grace
+        self.max_leases = max_leases
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.finished = queue.Queue()
+
+    def _requeue_expired(self):
+        now = self.clock()
+        for unit_id, (worker, deadline) in list(self.leases.items()):
+            if deadline >= now:
+                continue
+            del self.leases[unit_id]
+            if self.lease_counts[unit_id] < self.max_leases:
+                self.pending.append(unit_id)
+                continue
+            self.done.add(unit_id)
+            error = f"lease expired {self.max_leases} times, last by {worker}"
+            self.finished.put((unit_id, None, error))
+
+    def lease(self, worker: str) -> dict | None:
+        """
+        Returns the next unit to test or `None` if no unit is available at the
+        moment.
+        """
+        with self.lock:
+            self._requeue_expired()
+            if len(self.pending) == 0:
+                return None
+            unit_id = self.pending.pop()
+            unit = self.units[unit_id]
+            deadline = self.clock() + unit["timeout"] + self.grace
+            self.leases[unit_id] = (worker, deadline)
+            self.lease_counts[unit_id] += 1
+            return unit
+
+    def complete(self, unit_id: int, result: list | None, error: str | None = None):
+        """
+        Records the result of a unit, or the error of the worker failing to
+        test it. Only the first report of a unit counts.
+        """
+        with self.lock:
+            if unit_id in self.done or unit_id not in self.units:
+                return
+            self.leases.pop(unit_id, None)
+            if unit_id in self.pending:
+                self.pending.remove(unit_id)
+            self.done.add(unit_id)
+        self.finished.put((unit_id, result, error))
+
+    def is_done(self) -> bool:
+        with self.lock:
+            return len(self.done) == len(self.units)
+
+    def results(self):
+        """
+        Yields `(unit id, result, error)` as results arrive until all units are
+        done. `result` is `None` for failed units.
+        """
+        for _ in range(len(self.units)):
+            yield self.finished.get()
+
+
+def _handler(coordinator: Coordinator):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def _reply(self, status: int, body: dict | None = None):
+            content = b"" if body is None else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if self.path == "/lease":
+                if coordinator.is_done():
+                    return self._reply(410)
+                unit = coordinator.lease(request.get("worker", "unknown"))
+                return self._reply(204) if unit is None else self._reply(200, unit)
+            if self.path == "/result":
+                coordinator.complete(
+                    request["id"], request.get("result"), request.get("error")
+                )
+                return self._reply(200, {})
+            self._reply(404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(coordinator: Coordinator, host: str, port: int):
+    """
+    Starts the HTTP server of `coordinator` in a background thread and returns
+    the server. Use `server.shutdown()` to stop it.
+    """
+    server = http.server.ThreadingHTTPServer((host, port), _handler(coordinator))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def _post(url: str, body: dict) -> tuple[int | None, dict | None]:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            content = response.read()
+            return response.status, json.loads(content) if content else None
+    except urllib.error.HTTPError as e:
+        return e.code, None
+    except OSError:
+        return None, None
+
+
+def work(url: str, worker: str, run, poll_interval: float = 1.0):
+    """
+    Leases units from the coordinator at `url`, tests them with `run` and
+    reports the results back until the coordinator has no units left or is
+    not reachable anymore. Exceptions of `run` are reported as the error of
+    the unit.
+    """
+    while True:
+        status, unit = _post(f"{url}/lease", {"worker": worker})
+        if status is None or status == 410:
+            return
+        if status == 204 or unit is None:
+            time.sleep(poll_interval)
+            continue
+        try:
+            report = {"id": unit["id"], "result": run(unit)}
+        except Exception as e:
+            report = {"id": unit["id"], "error": f"{type(e).__name__}: {e}"}
+        _post(f"{url}/result", report)
@@ -0,0 +1,146 @@
+import ast
+import hashlib
+import operator
+import pathlib
+
+from ..store import read_mutant
+
+_binary_operators = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.LShift: operator.lshift,
+    ast.RShift: operator.rshift,
+    ast.BitOr: operator.or_,
+    ast.BitXor: operator.xor,
+    ast.BitAnd: operator.and_,
+}
+_unary_operators = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+    ast.Not: operator.not_,
+    ast.Invert: operator.invert,
+}
+# `not a == b` is not inverted, as `__eq__` and `__ne__` may be unrelated and
+# return arbitrary objects (e.g. numpy arrays).
+_inverted_comparisons = {
+    ast.Is: ast.IsNot,
+    ast.IsNot: ast.Is,
+    ast.In: ast.NotIn,
+    ast.NotIn: ast.In,
+}
+_constant_types = (int, float, complex, str, bytes, bool, type(None))
+# Limits the size of folded constants, e.g. `2 ** 100000` or `"a" * 100000`.
+_max_operand = 64
+
+
+def _is_constant(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) and isinstance(node.value, _constant_types)
+
+
+class _Normalizer(ast.NodeTransformer):
+    """
+    Rewrites a module into a canonical form. Folds constant expressions and
+    rewrites `not a is b` and `not a in b` to `a is not b` and `a not in b`.
+    Docstrings are kept, as they are observable through `__doc__` and doctests.
+    """
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        function = _binary_operators.get(type(node.op))
+        if function is None or not _is_constant(node.left):
+            return node
+        if not _is_constant(node.right):
+            return node
+        left, right = node.left.value, node.right.value
+        if isinstance(node.op, (ast.Pow, ast.LShift, ast.Mult)):
+            if any(
+                isinstance(value, int) and abs(value) > _max_operand
+                for value in [left, right]
+            ):
+                return node
+        try:
+            return ast.Constant(function(left, right))
+        except Exception:
+            return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not) and isinstance(node.operand, ast.Compare):
+            compare = node.operand
+            inverted = _inverted_comparisons.get(type(compare.ops[0]))
+            if len(compare.ops) == 1 and inverted is not None:
+                return ast.Compare(compare.left, [inverted()], compare.comparators)
+        if not _is_constant(node.operand):
+            return node
+        try:
+            return ast.Constant(_unary_operators[type(node.op)](node.operand.value))
+        except Exception:
+            return node
+
+
+def normalize_tree(tree: ast.AST) -> ast.AST:
+    """
+    Folds constant expressions of `tree` in place.
+    """
+    return _Normalizer().visit(tree)
+
+
+def normalize(source: bytes) -> str | None:
+    """
+    Returns a hash of `source` ignoring formatting, comments and some trivially
+    equivalent rewrites. Returns `None` if `source` cannot be
+    parsed.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    tree = normalize_tree(tree)
+    dump = ast.dump(tree, annotate_fields=False, include_attributes=False)
+    return hashlib.sha256(dump.encode()).hexdigest()
+
+
+def deduplicate(
+    mutants: dict, source_root: pathlib.Path
+) -> tuple[list[tuple], dict[pathlib.Path, list[tuple]]]:
+    """
+    Removes mutants equivalent to the source file or to another mutant of the
+    same module from `mutants` (`{module: {target: [(path, source, hash)]}}`).
+
+    Returns the mutants equivalent to their source file as
+    `(module, target, path, source, hash)` and a mapping from each mutant that
+    is still tested to its removed duplicates.
+    """
+    originals = {}
+    representatives = {}
+    equivalent = []
+    duplicates = {}
+    for module_name, module in mutants.items():
+        for target_name, target in module.items():
+            kept = []
+            for path, source, file_hash in target:
+                key = normalize(read_mutant(path, source_root))
+                if key is None:
+                    kept.append((path, source, file_hash))
+                    continue
+                if source not in originals:
+                    original = source_root / source
+                    originals[source] = (
+                        normalize(original.read_bytes()) if original.is_file() else None
+                    )
+                entry = (module_name, target_name, path, source, file_hash)
+                if key == originals[source]:
+                    equivalent.append(entry)
+                elif (module_name, key) in representatives:
+                    representative = representatives[(module_name, key)]
+                    duplicates.setdefault(representative, []).append(entry)
+                else:
+                    representatives[(module_name, key)] = path
+                    kept.append((path, source, file_hash))
+            module[target_name] = kept
+    return equivalent, duplicates
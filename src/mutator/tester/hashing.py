@@ -0,0 +1,25 @@
+import hashlib
+import pathlib
+
+
+def hash_content(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_file(path: pathlib.Path) -> str:
+    return hash_content(path.read_bytes())
+
+
+def hash_project(
+    project: pathlib.Path, directories: tuple[str, ...] = ("src", "tests")
+) -> str:
+    """
+    Hashes all python source and test files of `project`. Changes to any of
+    these may change the outcome of a test run.
+    """
+    digest = hashlib.sha256()
+    for directory in directories:
+        for path in sorted(project.joinpath(directory).rglob("*.py")):
+            digest.update(str(path.relative_to(project)).encode())
+            digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
@@ -0,0 +1,45 @@
+import re
+from collections import Counter
+
+_failed_pattern = re.compile(r"^(?:FAILED|ERROR) (\S+)", re.MULTILINE)
+
+
+def failed_tests(output: str) -> list[str]:
+    """
+    Extracts the ids of failed tests from the short test summary of pytest.
+    """
+    return _failed_pattern.findall(output)
+
+
+def killing_tests(report: dict[str, list] | None, output: str) -> list[str]:
+    """
+    Returns the failed and errored tests of a test report created by
+    `mutator_runner.report`. Falls back to the pytest output without a report.
+    """
+    if report is None:
+        return failed_tests(output)
+    return [
+        test for test, (outcome, _) in report.items() if outcome in ["failed", "error"]
+    ]
+
+
+def kill_order(modules: dict) -> dict[str, list[str]]:
+    """
+    Ranks the tests for each target (`<module>:<target>`) by the number of
+    mutants of this target they killed in a previous test run.
+    """
+    order = {}
+    for module, targets in modules.items():
+        for target, mutants in targets.items():
+            counter = Counter()
+            for mutant in mutants.values():
+                if not mutant["dead"] or mutant["syntax_error"] or mutant["timeout"]:
+                    continue
+                killed_by = mutant.get("killed_by")
+                if killed_by is None:
+                    killed_by = killing_tests(
+                        mutant.get("tests"), mutant.get("output", "")
+                    )
+                counter.update(killed_by)
+            order[f"{module}:{target}"] = [test for test, _ in counter.most_common()]
+    return order
@@ -0,0 +1,191 @@
+import array
+import heapq
+import json
+import pathlib
+import struct
+
+from .history import killing_tests
+
+_MAGIC = b"KMX1"
+
+
+class KillMatrix:
+    """
+    Records which tests killed which mutant (`(module, target, mutant)`). The
+    killing tests of all mutants are stored column-wise in compressed sparse row
+    form: the killing tests of mutant `i` are the test indices
+    `columns[offsets[i]:offsets[i + 1]]`. Live mutants kill no test. Mutants
+    that timed out or do not compile are not included, as they are not killed by
+    a specific test.
+
+    Queries use one bitset per mutant (`rows`), which is built on first use.
+    """
+
+    def __init__(
+        self,
+        tests: list[str],
+        names: str,
+        offsets: array.array,
+        columns: array.array,
+    ):
+        self.tests = tests
+        self._names = names
+        self._mutants = None
+        self.offsets = offsets
+        self.columns = columns
+        self._rows = None
+
+    @staticmethod
+    def from_result(modules: dict, tests: list[str]) -> "KillMatrix":
+        """
+        Builds the matrix from the entries of a `Result`. `tests` are all tests
+        executed, which also includes tests killing no mutant.
+        """
+        indices = {test: index for index, test in enumerate(tests)}
+        names = []
+        offsets = array.array("I", [0])
+        columns = array.array("I")
+        killers = []
+        for module, targets in modules.items():
+            for target, entries in targets.items():
+                for mutant, entry in entries.items():
+                    if entry["syntax_error"] or entry["timeout"]:
+                        continue
+                    killed_by = []
+                    if entry["dead"]:
+                        killed_by = entry.get("killed_by")
+                        if killed_by is None:
+                            killed_by = killing_tests(
+                                entry.get("tests"), entry.get("output", "")
+                            )
+                    names.append(f"{module}\t{target}\t{mutant}")
+                    killers.append(killed_by)
+        for killed_by in killers:
+            row = {indices.setdefault(test, len(indices)) for test in killed_by}
+            columns.extend(sorted(row))
+            offsets.append(len(columns))
+        return KillMatrix(list(indices), "\n".join(names), offsets, columns)
+
+    @staticmethod
+    def read(path: pathlib.Path) -> "KillMatrix":
+        content = path.read_bytes()
+        if content[:4] != _MAGIC:
+            raise Exception(f"{path} is not a kill matrix")
+        header_size, count, size = struct.unpack_from("<III", content, 4)
+        start = 16
+        header = json.loads(content[start : start + header_size])
+        start += header_size
+        offsets = array.array("I")
+        offsets.frombytes(content[start : start + 4 * (count + 1)])
+        start += 4 * (count + 1)
+        columns = array.array("I")
+        columns.frombytes(content[start : start + 4 * size])
+        return KillMatrix(header["tests"], header["mutants"], offsets, columns)
+
+    def write(self, path: pathlib.Path):
+        header = json.dumps({"tests": self.tests, "mutants": self._names}).encode()
+        with open(path, "wb") as file:
+            file.write(_MAGIC)
+            file.write(
+                struct.pack(
+                    "<III", len(header), len(self.offsets) - 1, len(self.columns)
+                )
+            )
+            file.write(header)
+            file.write(self.offsets.tobytes())
+            file.write(self.columns.tobytes())
+
+    @property
+    def mutants(self) -> list[tuple[str, str, str]]:
+        if self._mutants is None:
+            lines = self._names.split("\n") if self._names != "" else []
+            self._mutants = [tuple(line.split("\t")) for line in lines]
+        return self._mutants
+
+    @property
+    def rows(self) -> list[int]:
+        if self._rows is None:
+            rows = []
+            for i in range(len(self.offsets) - 1):
+                row = 0
+                for column in self.columns[self.offsets[i] : self.offsets[i + 1]]:
+                    row |= 1 << column
+                rows.append(row)
+            self._rows = rows
+        return self._rows
+
+    def killed_by(self, index: int) -> list[str]:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return [self.tests[column] for column in self.columns[start:end]]
+
+    def useless_tests(self) -> list[str]:
+        "Returns the tests that killed no mutant."
+        killing = set(self.columns)
+        return [test for i, test in enumerate(self.tests) if i not in killing]
+
+    def minimal_tests(self) -> list[str]:
+        """
+        Returns a small subset of tests killing all killed mutants. The subset is
+        chosen greedily and therefore not necessarily minimal.
+        """
+        killed = [0] * len(self.tests)
+        for index in range(len(self.offsets) - 1):
+            for column in self.columns[self.offsets[index] : self.offsets[index + 1]]:
+                killed[column] |= 1 << index
+        remaining = 0
+        for mutants in killed:
+            remaining |= mutants
+        # Lazy greedy: the gain of a test can only shrink, so a test whose
+        # updated gain is still the largest one is the best choice.
+        heap = [(-mutants.bit_count(), i) for i, mutants in enumerate(killed)]
+        heapq.heapify(heap)
+        selected = []
+        while remaining != 0:
+            _, i = heapq.heappop(heap)
+            gain = (killed[i] & remaining).bit_count()
+            if len(heap) > 0 and gain < -heap[0][0]:
+                heapq.heappush(heap, (-gain, i))
+                continue
+            selected.append(self.tests[i])
+            remaining &= ~killed[i]
+        return selected
+
+    def subsumed(self) -> dict[int, int]:
+        """
+        Maps each killed mutant, whose set of killing tests is a superset of the
+        killing tests of another mutant, onto that mutant (as indices). Any test
+        killing the latter also kills the former, so the former is redundant.
+        Of several mutants with equal sets, all but the first are subsumed.
+        """
+        rows = self.rows
+        first = {}
+        for index, row in enumerate(rows):
+            if row != 0:
+                first.setdefault(row, index)
+        # Minimal rows indexed by their lowest test, a subset of `row` has its
+        # lowest test in `row` as well.
+        minimal = {}
+        representative = {}
+        for row in sorted(first, key=lambda row: row.bit_count()):
+            subset = None
+            bits = row
+            while bits != 0 and subset is None:
+                low = bits & -bits
+                bits ^= low
+                for other in minimal.get(low, []):
+                    if other & ~row == 0:
+                        subset = other
+                        break
+            if subset is None:
+                minimal.setdefault(row & -row, []).append(row)
+            else:
+                representative[row] = first[subset]
+        result = {}
+        for index, row in enumerate(rows):
+            if row == 0:
+                continue
+            if row in representative:
+                result[index] = representative[row]
+            elif first[row] != index:
+                result[index] = first[row]
+        return result
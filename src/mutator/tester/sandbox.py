@@ -0,0 +1,37 @@
+import os
+import pathlib
+import shutil
+
+
+def _link(src: str, dst: str):
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Hard links are not possible across file systems.
+        os.symlink(os.path.abspath(src), dst)
+
+
+def create_sandbox(
+    kind: str, project: pathlib.Path, dest: pathlib.Path, ignore: list[str]
+) -> pathlib.Path:
+    """
+    Prepares the directory used to run the tests of `project` in and returns it.
+    Files and directories matching any glob in `ignore` are left out.
+
+    - `copy` copies the project to `dest`.
+    - `link` recreates the directory tree at `dest`, but hard links (or symlinks
+      as fallback) all files. Tests modifying files in place will modify the
+      original project.
+    - `none` runs directly inside of the project.
+    """
+    if kind == "none":
+        return project
+    if not dest.exists():
+        copy_function = _link if kind == "link" else shutil.copy2
+        shutil.copytree(
+            project,
+            dest,
+            ignore=shutil.ignore_patterns(*ignore),
+            copy_function=copy_function,
+        )
+    return dest
@@ -0,0 +1,52 @@
+class CostModel:
+    """
+    Estimates the cost of testing a mutant from previous test results. The
+    expected duration of a target is the mean duration of its previously tested
+    mutants, weighted with the fraction of them running into a timeout.
+    """
+
+    def __init__(self, modules: dict | None):
+        self.durations = {}
+        self.timeout_rates = {}
+        for module, targets in (modules or {}).items():
+            for target, mutants in targets.items():
+                durations = []
+                timeouts = 0
+                tested = 0
+                for mutant in mutants.values():
+                    if mutant.get("syntax_error", False):
+                        continue
+                    tested += 1
+                    if mutant.get("timeout", False):
+                        timeouts += 1
+                    elif "duration" in mutant:
+                        durations.append(mutant["duration"])
+                key = f"{module}:{target}"
+                if len(durations) > 0:
+                    self.durations[key] = sum(durations) / len(durations)
+                if tested > 0:
+                    self.timeout_rates[key] = timeouts / tested
+
+    def cost(
+        self, module: str, target: str, estimate: float | None, time_limit: float
+    ) -> float:
+        """
+        Returns the expected duration of testing a mutant of `target`. Previous
+        durations take precedence over `estimate`, which is usually based on the
+        baseline run of the test suite.
+        """
+        key = f"{module}:{target}"
+        duration = self.durations.get(key, estimate)
+        if duration is None:
+            duration = 1.0
+        rate = self.timeout_rates.get(key, 0.0)
+        return rate * time_limit + (1 - rate) * min(duration, time_limit)
+
+
+def longest_first(items: list, costs: list[float]) -> list:
+    """
+    Orders `items` by descending cost, such that long running items do not
+    delay the end of the test session.
+    """
+    order = sorted(range(len(items)), key=lambda i: costs[i], reverse=True)
+    return [items[i] for i in order]
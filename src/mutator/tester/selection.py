@@ -0,0 +1,111 @@
+import json
+import pathlib
+import subprocess
+import tempfile
+
+from ..helper.pattern import Filter
+from ..source import SourceFile
+from ..treesitter.context import Context
+
+
+class CoverageFailed(Exception):
+    "Raised when the coverage pass did not produce a coverage report"
+
+
+def collect_coverage(project: pathlib.Path) -> dict:
+    """
+    Runs the unmutated test suite of `project` once and returns the functions
+    called by each test (see `mutator_runner.coverage`).
+    """
+    with tempfile.NamedTemporaryFile(suffix=".json") as out:
+        subprocess.run(
+            ["python3", "-m", "mutator_runner", "--coverage", out.name],
+            capture_output=True,
+            cwd=project,
+        )
+        content = pathlib.Path(out.name).read_bytes()
+    if len(content) == 0:
+        raise CoverageFailed()
+    return json.loads(content)
+
+
+class TestIndex:
+    """
+    Maps each mutant target (`<module>:<target>`) onto the tests calling it.
+    Targets mapped onto `None` are called during test collection or unknown and
+    must be tested with the whole test suite. In addition, the duration of each
+    test measured during the coverage pass and the hash of the project it was
+    built for (see `hash_project`) are kept.
+    """
+
+    __test__ = False
+
+    def __init__(
+        self,
+        targets: dict[str, list[str] | None],
+        durations: dict[str, float],
+        project_hash: str | None = None,
+    ):
+        self.targets = targets
+        self.durations = durations
+        self.project_hash = project_hash
+
+    @staticmethod
+    def build(
+        coverage: dict, project: pathlib.Path, project_hash: str | None = None
+    ) -> "TestIndex":
+        """
+        Raises `CoverageFailed` if no call of a project function was recorded,
+        which would leave every target without tests.
+        """
+        source_root = project.joinpath("src").resolve()
+        ranges = {}
+        for file in source_root.rglob("*.py"):
+            source = SourceFile(source_root, file, Filter(["*"]))
+            path = str(pathlib.Path("src") / source.path)
+            for target in source.targets:
+                start = Context(target.node).with_decorater().start_point[0] + 1
+                end = target.node.end_point[0] + 1
+                name = f"{source.module}:{target.fullname}"
+                ranges.setdefault(path, []).append((start, end, name))
+
+        def reached(calls: list[list[int]]) -> set[str]:
+            names = set()
+            for file_index, line in calls:
+                path = coverage["files"][file_index]
+                for start, end, name in ranges.get(path, []):
+                    if start <= line <= end:
+                        names.add(name)
+            return names
+
+        targets = {name: [] for entries in ranges.values() for *_, name in entries}
+        found = False
+        for test, entry in coverage["tests"].items():
+            for name in reached(entry["calls"]):
+                targets[name].append(test)
+                found = True
+        for name in reached(coverage["collection"]):
+            targets[name] = None
+            found = True
+        if not found and len(targets) > 0:
+            raise CoverageFailed("no calls of project functions were recorded")
+        durations = {
+            test: entry["duration"] for test, entry in coverage["tests"].items()
+        }
+        return TestIndex(targets, durations, project_hash)
+
+    @staticmethod
+    def read(path: pathlib.Path) -> "TestIndex":
+        data = json.loads(path.read_bytes())
+        return TestIndex(data["targets"], data["durations"], data.get("project_hash"))
+
+    def write(self, path: pathlib.Path):
+        data = {
+            "targets": self.targets,
+            "durations": self.durations,
+            "project_hash": self.project_hash,
+        }
+        path.write_bytes(json.dumps(data).encode())
+
+    def tests_for(self, module: str, target: str) -> list[str] | None:
+        return self.targets.get(f"{module}:{target}")
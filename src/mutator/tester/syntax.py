@@ -0,0 +1,13 @@
+import traceback
+
+
+def syntax_error(content: bytes, filename: str) -> str | None:
+    """
+    Compiles the mutant file `content` without executing it. Returns the
+    formatted syntax error or `None` if `content` compiles.
+    """
+    try:
+        compile(content, filename, "exec", dont_inherit=True)
+    except (SyntaxError, ValueError) as e:
+        return "".join(traceback.format_exception_only(e))
+    return None
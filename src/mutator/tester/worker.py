@@ -0,0 +1,108 @@
+import json
+import os
+import select
+import signal
+import subprocess
+
+
+class WorkerCrashed(Exception):
+    "Raised when a runner worker exits without reporting a result"
+
+
+class RunnerWorker:
+    """
+    Keeps a `mutator_runner --worker` process alive to test several mutants
+    without paying the interpreter startup and the imports of unmutated modules
+    for each of them. The tests are still collected for each mutant.
+    The process is restarted after a timeout, a crash or `recycle` mutants. A
+    worker killed by `SIGXCPU` or `SIGKILL` (CPU time or memory limit) is
+    reported as the result of the mutant instead of a crash.
+
+    With `fork` set, a `mutator_runner --fork-server` is used instead, which
+    forks a fresh child per mutant and enforces the timeout itself.
+    """
+
+    # Additional time granted to the fork server to report a timed out child.
+    FORK_GRACE = 5.0
+
+    def __init__(self, project: str | os.PathLike, recycle: int, fork: bool = False):
+        self.project = project
+        self.recycle = recycle
+        self.fork = fork
+        self.process = None
+        self.count = 0
+
+    def _spawn(self):
+        flag = "--fork-server" if self.fork else "--worker"
+        self.process = subprocess.Popen(
+            ["python3", "-m", "mutator_runner", flag],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.project,
+        )
+        self.count = 0
+
+    def close(self):
+        if self.process is None:
+            return
+        self.process.kill()
+        self.process.wait()
+        self.process = None
+
+    def run(
+        self,
+        patches: list[tuple[str, str | dict]],
+        timeout: float,
+        args: list[str] | None = None,
+        first: list[str] | None = None,
+        limits: dict | None = None,
+    ) -> tuple[int | None, str, dict | None, dict | None]:
+        """
+        Tests a single mutant given as pairs of mutated module and path or byte
+        range patch (see `mutator_runner.injector.from_patch`). Returns the
+        pytest exit code, the captured output, the resource usage and the test
+        report (see `mutator_runner.report`). The exit code is `None` if the test
+        suite did not finish in time. Tests in `first` are run before all other
+        tests. See `mutator_runner.limits` for `limits`.
+        """
+        if self.process is None or (not self.fork and self.count >= self.recycle):
+            self.close()
+            self._spawn()
+        self.count += 1
+        request = {
+            "patches": [list(patch) for patch in patches],
+            "args": args or [],
+            "first": first or [],
+            "limits": limits or {},
+            "timeout": timeout,
+        }
+        try:
+            self.process.stdin.write((json.dumps(request) + "\n").encode())
+            self.process.stdin.flush()
+        except BrokenPipeError as e:
+            self.close()
+            raise WorkerCrashed() from e
+        if self.fork:
+            timeout += self.FORK_GRACE
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if len(ready) == 0:
+            self.close()
+            return None, "<timeout>", None, None
+        line = self.process.stdout.readline()
+        if len(line) == 0:
+            try:
+                returncode = self.process.wait(self.FORK_GRACE)
+            except subprocess.TimeoutExpired:
+                returncode = None
+            self.close()
+            if returncode in [-signal.SIGXCPU, -signal.SIGKILL]:
+                return returncode, "", None, None
+            raise WorkerCrashed()
+        response = json.loads(line)
+        return (
+            response["exit_code"],
+            response["output"],
+            response.get("usage"),
+            response.get("report"),
+        )
@@ -1,20 +1,115 @@
 import argparse
+import json
 import pathlib
+import sys
 
 import pytest
 
-from .injector import DependencyInjector
+from .injector import from_patch
+from .limits import MEMORY_NOTE, apply, usage
+from .ordering import KillFirst
+from .report import TestReport
 
 
 def cli_main():
     parser = argparse.ArgumentParser(
         prog="mutator", description="Pytest runner for mutated source code."
     )
-    parser.add_argument("-m", "--module", action="store")
-    parser.add_argument("-p", "--path", action="store")
+    parser.add_argument(
+        "-m",
+        "--module",
+        action="append",
+        default=[],
+        help="Mutated module. Can be used multiple times together with --path.",
+    )
+    parser.add_argument("-p", "--path", action="append", default=[])
+    parser.add_argument(
+        "--patches",
+        action="store",
+        help="Read additional mutated modules as JSON list of [module, patch] from "
+        + "this file or stdin (`-`). See `injector.from_patch`.",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Keep running and read mutants to test as JSON lines from stdin. The "
+        + "tests are collected again for each mutant, only imports are reused.",
+    )
+    parser.add_argument(
+        "--fork-server",
+        action="store_true",
+        help="Collect tests once and fork a child for each mutant read from stdin.",
+    )
+    parser.add_argument(
+        "--coverage",
+        action="store",
+        help="Run the unmutated test suite and store the functions called per test.",
+    )
+    parser.add_argument(
+        "--first",
+        action="append",
+        default=[],
+        help="Run this test before all others. Can be used multiple times.",
+    )
+    parser.add_argument("--max-memory", type=int, help="Address space limit in MiB.")
+    parser.add_argument("--max-cpu", type=float, help="CPU time limit in seconds.")
+    parser.add_argument(
+        "--max-processes", type=int, help="Process limit of the current user."
+    )
+    parser.add_argument(
+        "--usage",
+        action="store",
+        help="Store the peak RSS and CPU time of the test run in this file.",
+    )
+    parser.add_argument(
+        "--report",
+        action="store",
+        help="Store the outcome and duration of each test in this file.",
+    )
     parser.add_argument("pytest_args", nargs="*")
     args = parser.parse_args()
 
-    injector = DependencyInjector(args.module, pathlib.Path(args.path))
-    injector.install()
-    return pytest.main(args.pytest_args)
+    if args.coverage is not None:
+        from .coverage import run
+
+        return run(pathlib.Path(args.coverage), args.pytest_args)
+
+    if args.fork_server:
+        from .forkserver import serve
+
+        return serve(args.pytest_args)
+
+    if args.worker:
+        from .worker import serve
+
+        return serve()
+
+    if len(args.module) != len(args.path):
+        parser.error("each --module requires exactly one --path")
+    patches = list(zip(args.module, args.path, strict=True))
+    if args.patches == "-":
+        patches += json.load(sys.stdin)
+    elif args.patches is not None:
+        patches += json.loads(pathlib.Path(args.patches).read_bytes())
+    for module, patch in patches:
+        from_patch(module, patch).install()
+    apply(
+        {
+            "memory": args.max_memory,
+            "cpu": args.max_cpu,
+            "processes": args.max_processes,
+        }
+    )
+    report = TestReport()
+    try:
+        exit_code = pytest.main(
+            args.pytest_args, plugins=[KillFirst(args.first), report]
+        )
+    except MemoryError:
+        print(f"\n{MEMORY_NOTE}")
+        exit_code = 1
+    if args.usage is not None:
+        pathlib.Path(args.usage).write_text(json.dumps(usage()))
+    if args.report is not None:
+        report.write(pathlib.Path(args.report))
+    return exit_code
@@ -0,0 +1,86 @@
+import json
+import os
+import pathlib
+import sys
+import threading
+import time
+
+import pytest
+
+
+class CallCoverage:
+    """
+    Pytest plugin recording which functions of the project are called by each
+    test. Only call events are traced, which keeps the overhead low compared to
+    line coverage. Functions are identified by file and first line number.
+    Paths are not resolved, as sandboxes may symlink the files of the project.
+    """
+
+    def __init__(self, root: pathlib.Path):
+        self.root = pathlib.Path(os.path.abspath(root))
+        self.files = {}
+        self.paths = []
+        self.current = set()
+        self.collection = self.current
+        self.tests = {}
+
+    def _file_index(self, filename: str) -> int | None:
+        index = self.files.get(filename, -1)
+        if index != -1:
+            return index
+        path = pathlib.Path(os.path.abspath(filename))
+        if path.is_relative_to(self.root):
+            self.files[filename] = len(self.paths)
+            self.paths.append(str(path.relative_to(self.root)))
+        else:
+            self.files[filename] = None
+        return self.files[filename]
+
+    def _trace(self, frame, event, arg):
+        if event == "call" and frame.f_code.co_name != "<module>":
+            code = frame.f_code
+            index = self._file_index(code.co_filename)
+            if index is not None:
+                self.current.add((index, code.co_firstlineno))
+        return None
+
+    def start(self):
+        sys.settrace(self._trace)
+        threading.settrace(self._trace)
+
+    def stop(self):
+        sys.settrace(None)
+        threading.settrace(None)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        self.current = set()
+        start = time.monotonic()
+        yield
+        self.tests[item.nodeid] = {
+            "duration": time.monotonic() - start,
+            "calls": sorted(self.current),
+        }
+        self.current = self.collection
+
+    def to_dict(self) -> dict:
+        return {
+            "files": self.paths,
+            "collection": sorted(self.collection),
+            "tests": self.tests,
+        }
+
+
+def run(out: pathlib.Path, args: list[str]) -> int:
+    """
+    Runs the unmutated test suite once and writes the functions called by each
+    test to `out`.
+    """
+    plugin = CallCoverage(pathlib.Path.cwd())
+    plugin.start()
+    try:
+        exit_code = pytest.main(args, plugins=[plugin])
+    finally:
+        plugin.stop()
+    out.write_text(json.dumps(plugin.to_dict()))
+    return exit_code
@@ -0,0 +1,116 @@
+import json
+import os
+import pathlib
+import select
+import signal
+import sys
+import tempfile
+import time
+
+import pytest
+
+from .injector import swap
+from .limits import MEMORY_NOTE, apply, child_usage
+from .ordering import KillFirst
+from .report import TestReport
+from .worker import _Output
+
+
+def _run_child(
+    patches: list[list[str]],
+    args: list[str],
+    first: list[str],
+    limits: dict,
+    report_path: pathlib.Path,
+    write_fd: int,
+):
+    os.dup2(write_fd, 1)
+    os.dup2(write_fd, 2)
+    os.close(write_fd)
+    exit_code = 1
+    try:
+        swap([], patches)
+        apply(limits)
+        report = TestReport()
+        exit_code = int(pytest.main(args, plugins=[KillFirst(first), report]))
+        report.write(report_path)
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else 1
+    except MemoryError:
+        print(f"\n{MEMORY_NOTE}")
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(exit_code)
+
+
+def _wait_child(
+    pid: int, read_fd: int, timeout: float
+) -> tuple[int | None, str, dict | None]:
+    deadline = time.monotonic() + timeout
+    output = b""
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            return None, "<timeout>", None
+        ready, _, _ = select.select([read_fd], [], [], remaining)
+        if len(ready) == 0:
+            continue
+        chunk = os.read(read_fd, 65536)
+        if len(chunk) == 0:
+            break
+        output += chunk
+    _, status, rusage = os.wait4(pid, 0)
+    exit_code = os.waitstatus_to_exitcode(status)
+    return exit_code, output.decode(errors="replace"), child_usage(rusage)
+
+
+def serve(args: list[str]) -> int:
+    """
+    Imports pytest and collects the (unmutated) test suite once. Afterwards, a
+    child process is forked for each requested mutant, which only replaces the
+    mutated modules and the modules depending on them. Requests and responses use
+    the same JSON lines protocol as `worker.serve`, requests additionally
+    contain a `timeout` in seconds.
+    """
+    output = _Output()
+    pytest.main(["--collect-only", "-q", *args])
+    sys.stdout.flush()
+    sys.stderr.flush()
+    for line in output.requests:
+        request = json.loads(line)
+        report_fd, report_path = tempfile.mkstemp(suffix=".json")
+        os.close(report_fd)
+        report_path = pathlib.Path(report_path)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            _run_child(
+                request["patches"],
+                request.get("args") or args,
+                request.get("first", []),
+                request.get("limits", {}),
+                report_path,
+                write_fd,
+            )
+        os.close(write_fd)
+        try:
+            exit_code, child_output, usage = _wait_child(
+                pid, read_fd, request["timeout"]
+            )
+        finally:
+            os.close(read_fd)
+        content = report_path.read_bytes()
+        report_path.unlink()
+        response = {
+            "exit_code": exit_code,
+            "output": child_output,
+            "usage": usage,
+            "report": json.loads(content) if len(content) > 0 else None,
+        }
+        output.responses.write(json.dumps(response) + "\n")
+        output.responses.flush()
+    return 0
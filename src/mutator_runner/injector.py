@@ -1,15 +1,27 @@
+import ast
 import collections.abc
 import importlib.abc
 import importlib.machinery
+import importlib.util
+import linecache
+import os
 import pathlib
 import sys
 import types
 
 
 class MutantLoader(importlib.abc.SourceLoader):
-    def __init__(self, module: str, path: pathlib.Path):
+    def __init__(
+        self,
+        module: str,
+        path: pathlib.Path,
+        package: bool = False,
+        content: bytes | None = None,
+    ):
         self.module = module
         self.path = path
+        self.package = package
+        self.content = content
 
     def get_filename(self, fullname: str) -> pathlib.Path:
         if fullname != self.module:
@@ -19,24 +31,217 @@ class MutantLoader(importlib.abc.SourceLoader):
     def get_data(self, path: pathlib.Path) -> bytes:
         if path != self.path:
             raise ImportError
+        if self.content is not None:
+            return self.content
         return self.path.read_bytes()
 
+    def is_package(self, fullname: str) -> bool:
+        return self.package
+
 
 class DependencyInjector(importlib.abc.MetaPathFinder):
-    def __init__(self, module: str, path: pathlib.Path):
+    """
+    Replaces the source of `module` with the mutant at `path`. The module keeps
+    the location (`__file__`), package (`__path__`, `__package__`) and submodule
+    search locations of the original module, such that package resources,
+    relative imports and mutants of `__init__.py` files work. Only the code is
+    compiled from the mutant.
+
+    If `content` is given, the mutant is compiled from it instead of reading
+    `path`. Tracebacks then show `content` for `path`.
+    """
+
+    def __init__(self, module: str, path: pathlib.Path, content: bytes | None = None):
         self.module = module
         self.path = path
+        self.content = content
+
+    def _original_spec(
+        self, fullname: str, path: collections.abc.Sequence[str] | None, target
+    ) -> importlib.machinery.ModuleSpec | None:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                return spec
+        return None
 
     def find_spec(
         self,
         fullname: str,
         path: collections.abc.Sequence[str] | None,
-        target: types.ModuleType | None = ...,
+        target: types.ModuleType | None = None,
     ) -> importlib.machinery.ModuleSpec | None:
-        if fullname == self.module:
-            loader = MutantLoader(self.module, self.path)
-            return importlib.machinery.ModuleSpec(fullname, loader)
-        return None
+        if fullname != self.module:
+            return None
+        original = self._original_spec(fullname, path, target)
+        locations = None if original is None else original.submodule_search_locations
+        loader = MutantLoader(
+            self.module, self.path, locations is not None, self.content
+        )
+        if original is None or not original.has_location:
+            return importlib.machinery.ModuleSpec(
+                fullname, loader, is_package=locations is not None
+            )
+        return importlib.util.spec_from_file_location(
+            fullname,
+            original.origin,
+            loader=loader,
+            submodule_search_locations=locations,
+        )
 
     def install(self):
         sys.meta_path.insert(0, self)
+        if self.content is not None:
+            lines = self.content.decode(errors="replace").splitlines(keepends=True)
+            # Entries without modification time are kept by `linecache.checkcache`.
+            linecache.cache[str(self.path)] = (
+                len(self.content),
+                None,
+                lines,
+                str(self.path),
+            )
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        if self.content is not None:
+            linecache.cache.pop(str(self.path), None)
+
+
+_originals: dict[str, tuple[tuple[int, int], bytes]] = {}
+
+
+def _read_original(path: str) -> bytes:
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _originals.get(path)
+    if cached is None or cached[0] != key:
+        cached = (key, pathlib.Path(path).read_bytes())
+        _originals[path] = cached
+    return cached[1]
+
+
+def from_patch(module: str, patch: str | dict) -> DependencyInjector:
+    """
+    Creates the injector of a mutated `module`. `patch` is either the path of the
+    mutated source file or a dictionary replacing the byte range `[start, end)`
+    of the original source `file` with `content`. The latter is applied in
+    memory, such that no copy of the mutated file is needed. Original files are
+    cached as long as they do not change.
+    """
+    if isinstance(patch, dict):
+        original = _read_original(patch["file"])
+        content = (
+            original[: patch["start"]]
+            + patch["content"].encode()
+            + original[patch["end"] :]
+        )
+        return DependencyInjector(module, pathlib.Path(patch["file"]), content)
+    return DependencyInjector(module, pathlib.Path(patch))
+
+
+def _is_local(module: types.ModuleType, root: pathlib.Path) -> bool:
+    file = getattr(module, "__file__", None)
+    if file is None:
+        return False
+    return pathlib.Path(file).resolve().is_relative_to(root)
+
+
+def _references(module: types.ModuleType, names: set[str]) -> bool:
+    for value in vars(module).values():
+        if isinstance(value, types.ModuleType):
+            # Parent packages are re-bound to the new submodule on import.
+            if value.__name__.startswith(module.__name__ + "."):
+                continue
+            if value.__name__ in names:
+                return True
+        elif getattr(value, "__module__", None) in names:
+            return True
+    return False
+
+
+_imports_cache: dict[str, frozenset[str]] = {}
+
+
+def _imports(module: types.ModuleType) -> frozenset[str]:
+    """
+    Returns the absolute names of the modules (and module attributes) imported
+    by the source file of `module`. Catches dependencies on plain values, e.g.
+    `from .sub import CONSTANT`, which `_references` cannot see.
+    """
+    file = module.__file__
+    if file in _imports_cache:
+        return _imports_cache[file]
+    names = set()
+    try:
+        tree = ast.parse(pathlib.Path(file).read_bytes())
+    except (OSError, SyntaxError, ValueError):
+        tree = ast.Module(body=[], type_ignores=[])
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            parts = []
+            if node.level > 0:
+                parts = (getattr(module, "__package__", None) or "").split(".")
+                parts = parts[: len(parts) - node.level + 1]
+            if node.module is not None:
+                parts.append(node.module)
+            base = ".".join(part for part in parts if part != "")
+            names.add(base)
+            names.update(f"{base}.{alias.name}" for alias in node.names)
+    _imports_cache[file] = frozenset(names)
+    return _imports_cache[file]
+
+
+def _submodules(name: str) -> set[str]:
+    return {other for other in sys.modules if other.startswith(name + ".")}
+
+
+def evict(module: str, root: pathlib.Path | None = None) -> set[str]:
+    """
+    Removes `module` and all modules located below `root` that (transitively)
+    import or reference it from `sys.modules`, including their submodules. The
+    next import will load them again.
+    """
+    root = (root or pathlib.Path.cwd()).resolve()
+    evicted = {module} | _submodules(module)
+    changed = True
+    while changed:
+        changed = False
+        for name, candidate in list(sys.modules.items()):
+            if name in evicted or candidate is None or not _is_local(candidate, root):
+                continue
+            if _imports(candidate) & evicted or _references(candidate, evicted):
+                # Submodules would not be bound to the reloaded package.
+                evicted |= {name} | _submodules(name)
+                changed = True
+    for name in evicted:
+        sys.modules.pop(name, None)
+    return evicted
+
+
+def swap(
+    previous: list[DependencyInjector],
+    patches: list[tuple[str, str | dict]],
+    root: pathlib.Path | None = None,
+) -> list[DependencyInjector]:
+    """
+    Replaces the mutants injected by `previous` with `patches` in a warm
+    interpreter. The previously and newly mutated modules and all local modules
+    depending on them are removed from `sys.modules`, such that the next import
+    loads them again. See `from_patch` for `patches`. Returns the injectors of
+    `patches`.
+    """
+    for injector in previous:
+        injector.uninstall()
+        evict(injector.module, root)
+    injectors = []
+    for module, patch in patches:
+        evict(module, root)
+        injectors.append(from_patch(module, patch))
+    for injector in injectors:
+        injector.install()
+    return injectors
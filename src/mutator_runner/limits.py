@@ -0,0 +1,71 @@
+import math
+import resource
+
+# Appended to the output of a test run aborted by a `MemoryError`.
+MEMORY_NOTE = "<memory limit exceeded>"
+
+
+def _set_soft_limit(kind: int, value: int, previous: dict[int, int]):
+    soft, hard = resource.getrlimit(kind)
+    previous.setdefault(kind, soft)
+    if hard != resource.RLIM_INFINITY:
+        value = min(value, hard)
+    resource.setrlimit(kind, (value, hard))
+
+
+def cpu_time() -> float:
+    """
+    Returns the CPU time used by this process and its waited for children.
+    """
+    total = 0.0
+    for who in [resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN]:
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def apply(limits: dict) -> dict[int, int]:
+    """
+    Restricts this process to `memory` MiB of address space, `cpu` seconds of
+    CPU time from now on and `processes` processes of the current user. Limits
+    set to `None` are left unchanged. Returns the previous soft limits, which
+    `restore` reinstates.
+    """
+    previous = {}
+    if limits.get("memory") is not None:
+        _set_soft_limit(resource.RLIMIT_AS, limits["memory"] * 1024 * 1024, previous)
+    if limits.get("cpu") is not None:
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        used = own.ru_utime + own.ru_stime
+        _set_soft_limit(resource.RLIMIT_CPU, math.ceil(used + limits["cpu"]), previous)
+    if limits.get("processes") is not None:
+        _set_soft_limit(resource.RLIMIT_NPROC, limits["processes"], previous)
+    return previous
+
+
+def restore(previous: dict[int, int]):
+    "Reinstates the soft limits returned by `apply`."
+    for kind, soft in previous.items():
+        _, hard = resource.getrlimit(kind)
+        resource.setrlimit(kind, (soft, hard))
+
+
+def usage(cpu_start: float = 0.0) -> dict:
+    """
+    Returns the peak resident set size in KiB of this process or its children
+    and the CPU time used since `cpu_start`.
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "max_rss": max(own.ru_maxrss, children.ru_maxrss),
+        "cpu_time": cpu_time() - cpu_start,
+    }
+
+
+def child_usage(rusage: resource.struct_rusage) -> dict:
+    "Converts the resource usage of a waited for child process."
+    return {
+        "max_rss": rusage.ru_maxrss,
+        "cpu_time": rusage.ru_utime + rusage.ru_stime,
+    }
@@ -0,0 +1,11 @@
+class KillFirst:
+    """
+    Pytest plugin moving the given tests to the front of the test session, in the
+    given order. Used to run tests that are likely to kill a mutant first.
+    """
+
+    def __init__(self, first: list[str]):
+        self.rank = {nodeid: i for i, nodeid in enumerate(first)}
+
+    def pytest_collection_modifyitems(self, session, config, items):
+        items.sort(key=lambda item: self.rank.get(item.nodeid, len(self.rank)))
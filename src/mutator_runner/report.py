@@ -0,0 +1,42 @@
+import json
+import pathlib
+
+
+class TestReport:
+    """
+    Pytest plugin recording the outcome (`passed`, `failed`, `error` or
+    `skipped`) and the duration of each test. Failing collectors are reported
+    as `error`.
+    """
+
+    __test__ = False
+
+    def __init__(self):
+        self.tests = {}
+
+    def _record(self, nodeid: str, outcome: str, duration: float):
+        previous, total = self.tests.get(nodeid, ("passed", 0.0))
+        if previous != "passed":
+            outcome = previous
+        self.tests[nodeid] = (outcome, round(total + duration, 6))
+
+    def pytest_runtest_logreport(self, report):
+        if report.passed:
+            outcome = "passed"
+        elif report.skipped:
+            outcome = "skipped"
+        elif report.when == "call":
+            outcome = "failed"
+        else:
+            outcome = "error"
+        self._record(report.nodeid, outcome, report.duration)
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self._record(report.nodeid, "error", 0.0)
+
+    def to_dict(self) -> dict[str, list]:
+        return {nodeid: list(entry) for nodeid, entry in self.tests.items()}
+
+    def write(self, path: pathlib.Path):
+        path.write_text(json.dumps(self.to_dict()))
@@ -0,0 +1,84 @@
+import json
+import os
+import pathlib
+import sys
+import tempfile
+
+import pytest
+
+from .injector import swap
+from .limits import MEMORY_NOTE, apply, cpu_time, restore, usage
+from .ordering import KillFirst
+from .report import TestReport
+
+
+class _Output:
+    """
+    Redirects stdout and stderr (including subprocesses) into a temporary file
+    and keeps a private copy of the original file descriptors for the protocol.
+    """
+
+    def __init__(self):
+        self.requests = os.fdopen(os.dup(0), "r")
+        self.responses = os.fdopen(os.dup(1), "w")
+        self.file = tempfile.TemporaryFile()
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+        os.dup2(self.file.fileno(), 1)
+        os.dup2(self.file.fileno(), 2)
+
+    def reset(self):
+        self.file.seek(0)
+        self.file.truncate()
+
+    def read(self) -> str:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self.file.seek(0)
+        return self.file.read().decode(errors="replace")
+
+
+def serve() -> int:
+    """
+    Runs mutants one after another inside this interpreter. Each request is a
+    single JSON line on stdin containing the mutated modules as `patches`
+    (`[[module, path], ...]`), `args`, the tests to run `first` and resource
+    `limits`. Modules not depending on a mutant stay imported, but pytest
+    collects the tests again for each mutant, as collected test items keep
+    references to the functions of the previous mutant. After each run a JSON line containing `exit_code`, `output`, the
+    resource `usage` and the test `report` is written to stdout. The peak RSS
+    reported is the one of this worker so far. The limits only apply while the
+    tests of a mutant run. Exceeding the CPU time limit terminates the worker,
+    running out of memory outside of a test adds `MEMORY_NOTE` to the output.
+    """
+    output = _Output()
+    root = pathlib.Path.cwd()
+    injectors = []
+    for line in output.requests:
+        request = json.loads(line)
+        injectors = swap(injectors, request["patches"], root)
+
+        output.reset()
+        previous = apply(request.get("limits", {}))
+        cpu_start = cpu_time()
+        note = ""
+        try:
+            report = TestReport()
+            plugins = [KillFirst(request.get("first", [])), report]
+            exit_code = int(pytest.main(request.get("args", []), plugins=plugins))
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else 1
+        except MemoryError:
+            exit_code, note = 1, f"\n{MEMORY_NOTE}"
+        finally:
+            restore(previous)
+        response = {
+            "exit_code": exit_code,
+            "output": output.read() + note,
+            "usage": usage(cpu_start),
+            "report": report.to_dict(),
+        }
+        output.responses.write(json.dumps(response) + "\n")
+        output.responses.flush()
+    return 0
@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.fixture
+def runner_project(tmp_path):
+    "A small project to run the mutator runner in."
+    tmp_path.joinpath("pyproject.toml").write_text(
+        '[tool.pytest.ini_options]\npythonpath = ["src"]\n'
+    )
+    package = tmp_path / "src" / "pkg"
+    package.mkdir(parents=True)
+    package.joinpath("__init__.py").write_text("")
+    package.joinpath("mod.py").write_text("def add(a, b):\n    return a + b\n")
+    tests = tmp_path / "tests"
+    tests.mkdir()
+    tests.joinpath("test_mod.py").write_text(
+        "from pkg.mod import add\n\n\ndef test_add():\n    assert add(1, 2) == 3\n"
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def mutant(runner_project):
+    "Writes a mutant of `add` and returns it as list of patches."
+
+    def write(name: str, body: str) -> list:
+        path = runner_project / "mutants" / f"{name}.py"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(f"def add(a, b):\n    {body}\n")
+        return [("pkg.mod", str(path))]
+
+    return write
@@ -0,0 +1,101 @@
+import importlib
+
+from mutator.tester.batch import attribute, combine, patch_region, plan_batches
+
+cli_test = importlib.import_module("mutator.cli.test")
+
+original = b"""def foo(a):
+    return a + 1
+
+
+def bar(a):
+    return a * 2
+"""
+foo = original.replace(b"a + 1", b"a - 1")
+bar = original.replace(b"a * 2", b"a * 3")
+
+
+def test_patch_region():
+    start, end, replacement = patch_region(original, foo)
+    assert original[start:end] == b"+"
+    assert replacement == b"-"
+    assert patch_region(original, original)[:2] == (len(original), len(original))
+
+
+def test_patch_region_characters():
+    # "ä" and "ö" share their first UTF-8 byte.
+    start, end, replacement = patch_region("a = 'ä'".encode(), "a = 'ö'".encode())
+    assert "a = 'ä'".encode()[start:end].decode() == "ä"
+    assert replacement.decode() == "ö"
+
+
+def test_combine():
+    combined = combine(original, [foo, bar])
+    assert combined == original.replace(b"a + 1", b"a - 1").replace(b"a * 2", b"a * 3")
+    other = original.replace(b"a + 1", b"b + 2")
+    assert combine(original, [foo, other]) is None
+
+
+def test_plan_batches():
+    items = [
+        (["t1"], "a.py", (0, 5)),
+        (["t2"], "a.py", (10, 15)),
+        (["t1", "t3"], "b.py", (0, 5)),
+        (["t4"], "a.py", (3, 8)),
+        (None, "a.py", (20, 25)),
+        (["t5"], "c.py", (0, 5)),
+    ]
+    assert plan_batches(items, 2) == [[0, 1], [2, 3], [4], [5]]
+    assert plan_batches(items, 1) == [[0], [1], [2], [3], [4], [5]]
+
+
+def test_attribute():
+    tests = [["t1", "t2"], ["t3"], ["t4"]]
+    assert attribute(["t2", "t3"], tests) == [["t2"], ["t3"], []]
+    assert attribute([], tests) == [[], [], []]
+    assert attribute(["t5"], tests) is None
+
+
+def test_run_batch_batched(runner_project):
+    module = b"def add(a, b):\n    return a + b\n\n\ndef mul(a, b):\n    return a * b\n"
+    runner_project.joinpath("src", "pkg", "mod.py").write_bytes(module)
+    runner_project.joinpath("tests", "test_mod.py").write_text(
+        "from pkg.mod import add, mul\n\n\n"
+        + "def test_add():\n    assert add(1, 2) == 3\n\n\n"
+        + "def test_mul():\n    assert mul(2, 3) == 6\n"
+    )
+    mutants = runner_project / "mutants"
+    mutants.mkdir()
+
+    def job(name: str, content: bytes) -> object:
+        mutants.joinpath(f"{name}.py").write_bytes(content)
+        return cli_test._Job(
+            tmp_dir=str(runner_project / "tmp"),
+            project=runner_project,
+            sandbox="none",
+            sandbox_ignore=[],
+            timeout=60,
+            git_reset=False,
+            mode="subprocess",
+            recycle=0,
+            fail_fast=False,
+            module_name="pkg.mod",
+            target_name=name,
+            index=0,
+            mutant=mutants / f"{name}.py",
+            source="pkg/mod.py",
+            tests=[f"tests/test_mod.py::test_{name}"],
+            first=[],
+            file_hash="",
+            limits={},
+        )
+
+    add = job("add", module.replace(b"a + b", b"a - b"))
+    mul = job("mul", module.replace(b"a * b", b"b * a"))
+    results = cli_test._run_batch([add, mul])
+    assert [(result[1], result[4], batched) for result, batched in results] == [
+        ("add", True, True),
+        ("mul", False, True),
+    ]
+    [(result, batched)] = cli_test._run_batch([add])
+    assert result[4] and not batched
@@ -0,0 +1,56 @@
+import importlib
+
+from mutator.tester.cache import code_hash, mutant_key
+
+cli_test = importlib.import_module("mutator.cli.test")
+
+module = b"""import os
+
+
+class Foo:
+    def bar(self, a):
+        return a + 1
+
+
+def baz():
+    pass
+"""
+
+
+def test_code_hash_ignores_formatting():
+    a = "def foo(a):\n    return a + 1\n"
+    b = "def foo(a):\n\n    # comment\n    return (a +\n        1)\n"
+    assert code_hash(a) == code_hash(b)
+
+
+def test_code_hash_detects_changes():
+    a = "def foo(a):\n    return a + 1\n"
+    b = "def foo(a):\n    return a - 1\n"
+    assert code_hash(a) != code_hash(b)
+    assert code_hash("def foo(:\n    pass\n") is None
+
+
+def test_code_hash_normalized_nodes():
+    # Folded constants and rewritten comparisons are new nodes without locations.
+    assert code_hash("def foo():\n    return -1\n") is not None
+    assert code_hash("def foo():\n    return - 1\n") == code_hash(
+        "def foo():\n    return -1\n"
+    )
+    assert code_hash("def foo(a):\n    return not a is None\n") is not None
+    docstring_only = 'def foo():\n    "Docstring."\n'
+    assert code_hash(docstring_only) != code_hash("def foo():\n    pass\n")
+
+
+def test_mutant_key():
+    mutant = "def bar(self, a):\n        return a + 1"
+    moved = b"\n" + module
+    assert mutant_key(module, mutant, [4, 4]) is not None
+    assert mutant_key(module, mutant, [4, 4]) != mutant_key(moved, mutant, [5, 4])
+    assert mutant_key(module, mutant, [5, 4]) is None
+
+
+def test_cacheable():
+    assert cli_test._cacheable({"timeout": False, "output": "FAILED test_a\n"})
+    assert not cli_test._cacheable({"timeout": True, "output": "<timeout>"})
+    limited = {"timeout": False, "output": "\n<cpu time limit exceeded>"}
+    assert not cli_test._cacheable(limited)
@@ -0,0 +1,82 @@
+import pathlib
+
+import git
+
+from mutator.ai.llm_stats import LLMStats
+from mutator.generator import GeneratorConfig, Mutant
+from mutator.helper.changes import changed_lines
+from mutator.helper.pattern import Filter
+from mutator.source import SourceFile
+from mutator.store import MutantStore
+
+original = """def foo(a):
+    return a + 1
+
+
+def bar(a):
+    return a * 2
+
+
+def baz(a):
+    return a - 3
+"""
+
+
+def commit(repo: git.Repo, message: str):
+    repo.git.add(A=True)
+    repo.git.commit(m=message, author="a <a@b>")
+
+
+def test_changed_lines(tmp_path, monkeypatch):
+    monkeypatch.setenv("GIT_COMMITTER_NAME", "a")
+    monkeypatch.setenv("GIT_COMMITTER_EMAIL", "a@b")
+    repo = git.Repo.init(tmp_path)
+    source = tmp_path / "src" / "pkg" / "mod.py"
+    source.parent.mkdir(parents=True)
+    source.write_text(original)
+    commit(repo, "initial")
+
+    source.write_text(original.replace("a * 2", "a * 4"))
+    tmp_path.joinpath("src", "pkg", "new.py").write_text("def qux():\n    pass\n")
+    tmp_path.joinpath("README.md").write_text("readme")
+    changes = changed_lines(tmp_path, "HEAD")
+    assert changes == {
+        source.relative_to(tmp_path / "src"): [(6, 6)],
+        tmp_path.joinpath("src", "pkg", "new.py").relative_to(tmp_path / "src"): [
+            (1, 2)
+        ],
+    }
+
+    root = tmp_path.joinpath("src")
+    ranges = changes[source.relative_to(root)]
+    source_file = SourceFile(root, source, Filter(["*"]), ranges)
+    assert [target.fullname for target in source_file.targets] == ["bar"]
+
+
+def test_deleted_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("GIT_COMMITTER_NAME", "a")
+    monkeypatch.setenv("GIT_COMMITTER_EMAIL", "a@b")
+    repo = git.Repo.init(tmp_path)
+    root = tmp_path / "src"
+    source = root / "pkg" / "mod.py"
+    source.parent.mkdir(parents=True)
+    source.write_text(original)
+    commit(repo, "initial")
+
+    source_file = SourceFile(root, source, Filter(["*"]))
+    store = MutantStore(tmp_path / "out")
+    store.add(
+        source_file.targets[0],
+        Mutant("def foo(a):\n    return a - 1", None),
+        "model",
+        "generator",
+        "config",
+        GeneratorConfig({}, 1),
+        False,
+        LLMStats(),
+    )
+    source.unlink()
+    changes = changed_lines(tmp_path, "HEAD")
+    assert changes == {pathlib.Path("pkg", "mod.py"): []}
+    assert store.rebase(root, changes) == 1
+    assert list(store.list_mutants()) == []
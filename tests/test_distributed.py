@@ -0,0 +1,100 @@
+import threading
+
+from mutator.tester import Coordinator, serve_coordinator, work
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def units(count: int) -> list[dict]:
+    return [{"id": i, "timeout": 10} for i in range(count)]
+
+
+def test_lease_in_order():
+    coordinator = Coordinator(units(2), 5, clock=FakeClock())
+    assert coordinator.lease("a")["id"] == 0
+    assert coordinator.lease("b")["id"] == 1
+    assert coordinator.lease("c") is None
+
+
+def test_expired_lease_is_requeued():
+    clock = FakeClock()
+    coordinator = Coordinator(units(1), 5, clock=clock)
+    assert coordinator.lease("a")["id"] == 0
+    clock.now = 15
+    assert coordinator.lease("b") is None
+    clock.now = 16
+    assert coordinator.lease("b")["id"] == 0
+
+
+def test_duplicate_result_is_ignored():
+    clock = FakeClock()
+    coordinator = Coordinator(units(1), 5, clock=clock)
+    coordinator.lease("a")
+    clock.now = 100
+    coordinator.lease("b")
+    coordinator.complete(0, ["b"])
+    coordinator.complete(0, ["a"])
+    assert coordinator.is_done()
+    assert coordinator.lease("c") is None
+    assert list(coordinator.results()) == [(0, ["b"], None)]
+
+
+def test_lease_limit():
+    clock = FakeClock()
+    coordinator = Coordinator(units(1), 5, max_leases=2, clock=clock)
+    assert coordinator.lease("a")["id"] == 0
+    clock.now = 16
+    assert coordinator.lease("b")["id"] == 0
+    clock.now = 32
+    assert coordinator.lease("c") is None
+    assert coordinator.is_done()
+    [(unit_id, result, error)] = coordinator.results()
+    assert (unit_id, result) == (0, None)
+    assert "lease expired 2 times, last by b" in error
+
+
+def test_workers_over_http():
+    coordinator = Coordinator(units(8), 5)
+    server = serve_coordinator(coordinator, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    workers = [
+        threading.Thread(
+            target=work, args=(url, f"w{n}", lambda unit: [unit["id"] * 2], 0.01)
+        )
+        for n in range(3)
+    ]
+    try:
+        for worker in workers:
+            worker.start()
+        results = {unit_id: rest for unit_id, *rest in coordinator.results()}
+    finally:
+        server.shutdown()
+    for worker in workers:
+        worker.join(timeout=5)
+    assert results == {i: [[i * 2], None] for i in range(8)}
+
+
+def test_worker_error():
+    def run(unit: dict) -> list:
+        if unit["id"] == 1:
+            raise RuntimeError("broken")
+        return [unit["id"]]
+
+    coordinator = Coordinator(units(3), 5)
+    server = serve_coordinator(coordinator, "127.0.0.1", 0)
+    try:
+        work(f"http://127.0.0.1:{server.server_address[1]}", "w", run, 0.01)
+        results = {unit_id: rest for unit_id, *rest in coordinator.results()}
+    finally:
+        server.shutdown()
+    assert results == {
+        0: [[0], None],
+        1: [None, "RuntimeError: broken"],
+        2: [[2], None],
+    }
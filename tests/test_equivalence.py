@@ -0,0 +1,77 @@
+from mutator.tester.equivalence import normalize
+
+
+def test_formatting_and_comments():
+    a = b"""
+def foo(a, b):
+    return a * b + a
+"""
+    b = b"""
+def foo(a,b):
+    # multiply
+    return (a * b) + a
+"""
+    assert normalize(a) == normalize(b)
+
+
+def test_docstring():
+    a = b"""
+def foo(a, b):
+    "Multiply."
+    return a * b
+"""
+    b = b"""
+def foo(a, b):
+    return a * b
+"""
+    assert normalize(a) != normalize(b)
+
+
+def test_constant_folding():
+    a = b"""
+def foo(a):
+    return a * 4
+"""
+    b = b"""
+def foo(a):
+    return a * (2 + 2)
+"""
+    assert normalize(a) == normalize(b)
+
+
+def test_inverted_comparison():
+    a = b"""
+def foo(a):
+    return not a is None
+"""
+    b = b"""
+def foo(a):
+    return a is not None
+"""
+    assert normalize(a) == normalize(b)
+    assert normalize(b"not a in b") == normalize(b"a not in b")
+
+
+def test_equality_not_inverted():
+    # `__eq__` and `__ne__` of user-defined types may disagree.
+    assert normalize(b"not a == b") != normalize(b"a != b")
+
+
+def test_different():
+    a = b"""
+def foo(a, b):
+    return a * b
+"""
+    b = b"""
+def foo(a, b):
+    return a + b
+"""
+    assert normalize(a) != normalize(b)
+
+
+def test_large_constant_not_folded():
+    assert normalize(b"x = 2 ** 100000") != normalize(b"x = 2 ** 100001")
+
+
+def test_syntax_error():
+    assert normalize(b"def foo(:\n    pass") is None
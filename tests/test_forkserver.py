@@ -0,0 +1,52 @@
+import pytest
+
+from mutator.tester import RunnerWorker
+
+
+@pytest.fixture
+def server(runner_project):
+    server = RunnerWorker(runner_project, recycle=1, fork=True)
+    yield server
+    server.close()
+
+
+def test_run_and_restore(server, mutant):
+    exit_code, output, _, report = server.run(mutant("0", "return a - b"), 30)
+    assert exit_code == 1
+    assert "FAILED tests/test_mod.py::test_add" in output
+    assert report["tests/test_mod.py::test_add"][0] == "failed"
+    pid = server.process.pid
+    # Each mutant runs in its own child of the same server.
+    exit_code, _, usage, report = server.run([], 30)
+    assert exit_code == 0
+    assert report["tests/test_mod.py::test_add"][0] == "passed"
+    assert usage["cpu_time"] > 0
+    assert server.process.pid == pid
+
+
+def test_timeout(server, mutant):
+    server.run([], 30)
+    pid = server.process.pid
+    exit_code, output, _, report = server.run(mutant("0", "while True: pass"), 1)
+    assert (exit_code, output, report) == (None, "<timeout>", None)
+    # The server kills the child and keeps running.
+    assert server.process.pid == pid
+    assert server.run([], 30)[0] == 0
+
+
+def test_crash(server, mutant):
+    exit_code, _, _, report = server.run(mutant("0", "import os; os._exit(3)"), 30)
+    assert exit_code == 3
+    assert report is None
+    assert server.run([], 30)[0] == 0
+
+
+def test_memory_error(server, runner_project):
+    server.run([], 30)
+    # Raised by pytest itself, as MemoryErrors of tests only fail the test.
+    runner_project.joinpath("tests", "conftest.py").write_text(
+        "def pytest_unconfigure(config):\n    raise MemoryError()\n"
+    )
+    exit_code, output, _, _ = server.run([], 30)
+    assert exit_code == 1
+    assert output.endswith("<memory limit exceeded>\n")
@@ -0,0 +1,69 @@
+import importlib
+import sys
+
+import pytest
+
+from mutator_runner.injector import from_patch, swap
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    package = tmp_path / "pkg"
+    package.mkdir()
+    package.joinpath("__init__.py").write_text(
+        "from .sub import value\n\n\ndef f():\n    return value\n"
+    )
+    package.joinpath("sub.py").write_text("value = 1\n")
+    tmp_path.joinpath("user.py").write_text("from pkg import f\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    for name in ["pkg", "pkg.sub", "user"]:
+        sys.modules.pop(name, None)
+
+
+def _mutant(project, name, source):
+    path = project / "mutants" / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(source)
+    return path
+
+
+def test_package_mutant(project):
+    mutant = _mutant(
+        project, "0.py", "from .sub import value\n\n\ndef f():\n    return value + 1\n"
+    )
+    injectors = swap([], [("pkg", mutant)], project)
+    try:
+        pkg = importlib.import_module("pkg")
+        assert pkg.f() == 2
+        assert pkg.__path__ == [str(project / "pkg")]
+        assert pkg.__package__ == "pkg"
+        assert pkg.__file__ == str(project / "pkg" / "__init__.py")
+        assert pkg.__spec__.loader.is_package("pkg")
+        assert importlib.import_module("pkg.sub").value == 1
+    finally:
+        swap(injectors, [], project)
+
+
+def test_warm_swap(project):
+    assert importlib.import_module("user").f() == 1
+    mutant = _mutant(project, "0.py", "value = 2\n")
+    injectors = swap([], [("pkg.sub", mutant)], project)
+    assert "user" not in sys.modules
+    assert importlib.import_module("user").f() == 2
+    injectors = swap(injectors, [], project)
+    assert importlib.import_module("user").f() == 1
+
+
+def test_region_patch(project):
+    original = project / "pkg" / "sub.py"
+    patch = {"file": str(original), "start": 8, "end": 9, "content": "3"}
+    injector = from_patch("pkg.sub", patch)
+    assert injector.content == b"value = 3\n"
+    injectors = swap([], [("pkg.sub", patch)], project)
+    try:
+        assert importlib.import_module("pkg.sub").value == 3
+        assert importlib.import_module("pkg.sub").__file__ == str(original)
+        assert original.read_text() == "value = 1\n"
+    finally:
+        swap(injectors, [], project)
@@ -19,3 +19,14 @@ def test_function_limiter_incomplete_assignment():
             ctx ="""
     limiter = FunctionLimiter()
     assert limiter.extract_result(source) is None
+
+
+def test_function_limiter_incremental():
+    source = "def foo(a):\n    if a:\n        return 1\n    return 2\n\nfoo(1)\n"
+    suffix = "\n    return 3"
+    limiter = FunctionLimiter()
+    for end in range(1, len(source) + 1):
+        for result in [source[:end], source[:end] + suffix]:
+            expected = FunctionLimiter().extract_result(result)
+            assert limiter.extract_result(result) == expected
+    assert limiter.extract_result(source) == source[: source.index("\n\n")]
@@ -0,0 +1,23 @@
+import resource
+
+from mutator_runner.limits import apply, restore
+
+
+def test_apply_and_restore():
+    before = {
+        kind: resource.getrlimit(kind)
+        for kind in [resource.RLIMIT_AS, resource.RLIMIT_CPU]
+    }
+    previous = apply({"memory": 64 * 1024, "cpu": 3600, "processes": None})
+    try:
+        assert resource.getrlimit(resource.RLIMIT_AS)[0] <= 64 * 1024**3
+        assert resource.getrlimit(resource.RLIMIT_CPU)[0] >= 3600
+        assert set(previous) == {resource.RLIMIT_AS, resource.RLIMIT_CPU}
+    finally:
+        restore(previous)
+    for kind, limit in before.items():
+        assert resource.getrlimit(kind) == limit
+
+
+def test_apply_without_limits():
+    assert apply({"memory": None, "cpu": None, "processes": None}) == {}
@@ -0,0 +1,230 @@
+import pytest
+import tokenizers
+import torch
+import transformers
+from tokenizers import decoders, models, pre_tokenizers, processors
+
+from mutator.ai.benchmark import measure
+from mutator.ai.limiter.limiter import Limiter, OutputStoppingCriteria
+from mutator.ai.llm import LLM
+from mutator.ai.llm_stats import LLMStats
+from mutator.ai.prefix_cache import PrefixCache
+
+_special = [
+    "<pad>",
+    "<eos>",
+    "<bos>",
+    "<unk>",
+    "<|fim_prefix|>",
+    "<|fim_suffix|>",
+    "<|fim_middle|>",
+    "<|file_separator|>",
+]
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    characters = [chr(c) for c in range(32, 127)] + ["\n"]
+    vocab = {token: i for i, token in enumerate(_special + characters)}
+    tokenizer = tokenizers.Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Split("", "isolated")
+    tokenizer.decoder = decoders.Fuse()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="<bos> $A", special_tokens=[("<bos>", 2)]
+    )
+    return transformers.PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        bos_token="<bos>",
+        eos_token="<eos>",
+        pad_token="<pad>",
+        unk_token="<unk>",
+        additional_special_tokens=_special[4:],
+    )
+
+
+@pytest.fixture(scope="module")
+def llm(tokenizer):
+    torch.manual_seed(0)
+    config = transformers.GPT2Config(
+        vocab_size=len(tokenizer),
+        n_layer=2,
+        n_embd=32,
+        n_head=2,
+        n_positions=256,
+        bos_token_id=2,
+        eos_token_id=1,
+        pad_token_id=0,
+    )
+    llm = LLM.__new__(LLM)
+    llm.stats = LLMStats()
+    llm.device = torch.device("cpu")
+    llm.model = transformers.GPT2LMHeadModel(config).eval()
+    llm.tokenizer = tokenizer
+    llm.limiter_classes = []
+    llm.batch_size = 8
+    llm.prefix_cache = None
+    llm.generate_kwargs = {}
+    return llm
+
+
+class _ContainsLimiter(Limiter):
+    def __init__(self, text: str):
+        self.text = text
+
+    def extract_result(self, result: str) -> str | None:
+        return result if self.text in result else None
+
+
+prompts = ["def f(x):\n    return", "def g():\n    pass\n\n\ndef h(a, b):\n    if a"]
+
+
+def _trim(prompt: str):
+    return lambda result: result[len(prompt) :]
+
+
+def test_prompt_batch(llm):
+    transforms = [_trim(prompt) for prompt in prompts]
+    batched = llm.prompt_batch(prompts, transforms, max_new_tokens=8)
+    for prompt, transform, results in zip(prompts, transforms, batched, strict=True):
+        single = llm.prompt(prompt, transform, max_new_tokens=8)
+        assert [result.output for result in results] == [single[0].output]
+        assert results[0].output.startswith("<bos>" + prompt)
+        assert results[0].input_token_count == len(prompt) + 1
+        assert results[0].output_token_count == len(prompt) + 9
+
+
+def test_prompt_batch_return_sequences(llm):
+    transforms = [_trim(prompt) for prompt in prompts]
+    batched = llm.prompt_batch(
+        prompts, transforms, max_new_tokens=4, do_sample=True, num_return_sequences=3
+    )
+    assert [len(results) for results in batched] == [3, 3]
+    for prompt, results in zip(prompts, batched, strict=True):
+        assert all(result.prompt == prompt for result in results)
+
+
+def test_stopping_criteria_rows(tokenizer):
+    pad = tokenizer.pad_token_id
+    rows = [[pad, *tokenizer("ab").input_ids], tokenizer("xyz").input_ids]
+    criteria = OutputStoppingCriteria(
+        _ContainsLimiter("x"), tokenizer, [lambda result: result] * 2, [1, 0]
+    )
+    assert criteria(torch.tensor(rows), None).tolist() == [False, True]
+    criteria = OutputStoppingCriteria(
+        _ContainsLimiter("<pad>"), tokenizer, [lambda result: result] * 2, [1, 0]
+    )
+    assert criteria(torch.tensor(rows), None).tolist() == [False, False]
+
+
+def test_stopping_criteria_incremental(tokenizer):
+    ids = [tokenizer("ab").input_ids, tokenizer("ac").input_ids]
+    criteria = OutputStoppingCriteria(
+        _ContainsLimiter("bx"), tokenizer, [lambda result: result]
+    )
+    assert criteria(torch.tensor(ids), None).tolist() == [False, False]
+    # Beam search may reorder rows between steps.
+    x = tokenizer.convert_tokens_to_ids("x")
+    ids = [ids[1] + [x], ids[0] + [x]]
+    assert criteria(torch.tensor(ids), None).tolist() == [False, True]
+    assert [stream.text for stream in criteria._streams] == ["<bos>acx", "<bos>abx"]
+
+
+def test_prompt_tries(llm):
+    prompt = prompts[0]
+    llm.reset_stats()
+    results = llm.prompt_tries(
+        prompt, _trim(prompt), 4, do_sample=True, top_k=4, max_new_tokens=4
+    )
+    assert len(results) == 4
+    assert llm.stats.generate_count == 1
+    assert llm.stats.input_token_count == 4 * (len(prompt) + 1)
+    results = llm.prompt_tries(
+        prompt, _trim(prompt), 2, num_beams=2, num_return_sequences=2, max_new_tokens=4
+    )
+    assert len(results) == 4
+    assert llm.stats.generate_count == 2
+
+
+def test_prompt_batch_isolates_errors(llm):
+    def fail(result):
+        raise RuntimeError()
+
+    results = llm.prompt_batch(prompts, [_trim(prompts[0]), fail], max_new_tokens=4)
+    assert [len(prompt_results) for prompt_results in results] == [1, 0]
+
+
+def test_prompt_tries_isolates_errors(llm):
+    prompt = prompts[0]
+    calls = []
+
+    def flaky(result):
+        calls.append(result)
+        if len(calls) == 1:
+            raise RuntimeError()
+        return result[len(prompt) :]
+
+    llm.reset_stats()
+    results = llm.prompt_tries(
+        prompt, flaky, 3, do_sample=True, top_k=4, max_new_tokens=4
+    )
+    assert len(results) == 3
+    # The failed run of all tries and the retry with one row per try.
+    assert llm.stats.generate_count == 2
+
+
+def test_prefix_cache(llm):
+    transform = _trim(prompts[0])
+    other = prompts[0] + " x +"
+    expected = [
+        llm.prompt(prompt, transform, max_new_tokens=6)[0].output
+        for prompt in [prompts[0], other, prompts[0]]
+    ]
+    expected_beams = llm.prompt(other, transform, max_new_tokens=6, num_beams=2)
+    llm.prefix_cache = PrefixCache(1 << 20, min_length=2)
+    try:
+        llm.reset_stats()
+        outputs = [
+            llm.prompt(prompt, transform, max_new_tokens=6)[0].output
+            for prompt in [prompts[0], other, prompts[0]]
+        ]
+        assert outputs == expected
+        # All tokens of the first prompt, all but the last one when repeated.
+        assert llm.stats.cached_token_count == 2 * len(prompts[0]) + 1
+        beams = llm.prompt(other, transform, max_new_tokens=6, num_beams=2)
+        assert [result.output for result in beams] == [expected_beams[0].output]
+        assert len(llm.prefix_cache.entries) == 2
+    finally:
+        llm.prefix_cache = None
+
+
+def test_prefix_cache_budget():
+    cache = PrefixCache(100)
+    cache.store([1, 2], [torch.zeros(10, dtype=torch.int32)])
+    cache.store([1, 3], [torch.zeros(10, dtype=torch.int32)])
+    cache.store([4], [torch.zeros(10, dtype=torch.int32)])
+    assert list(cache.entries) == [(1, 3), (4,)]
+    cache.store([5], [torch.zeros(100, dtype=torch.int32)])
+    assert cache.size == 80
+
+
+def test_prefix_cache_lookup():
+    cache = PrefixCache(1 << 20, min_length=3)
+    entry = transformers.DynamicCache()
+    keys = torch.arange(5, dtype=torch.float32).reshape(1, 1, 5, 1)
+    entry.update(keys, keys + 1, 0)
+    cache.store([1, 2, 3, 4, 5], entry)
+    # Sharing only the BOS token (or any prefix below the minimum) is a miss.
+    assert cache.lookup([1, 2, 9], 2) == (0, None)
+    length, copied = cache.lookup([1, 2, 3, 4, 9], 4)
+    assert length == 4
+    assert copied.get_seq_length() == 4
+    assert copied.layers[0].keys.flatten().tolist() == [0, 1, 2, 3]
+    copied.layers[0].keys.zero_()
+    assert entry.get_seq_length() == 5
+    assert entry.layers[0].keys.flatten().tolist() == [0, 1, 2, 3, 4]
+
+
+def test_measure(llm):
+    result = measure(llm, prompts, max_new_tokens=5)
+    assert result.tokens == 2 * 5
+    assert result.tokens_per_second > 0
@@ -0,0 +1,79 @@
+from mutator.cli.matrix import read_result
+from mutator.result import Result
+from mutator.tester import KillMatrix
+
+
+def entry(killed_by: list[str] | None, **kwargs) -> dict:
+    return {
+        "dead": killed_by is not None,
+        "syntax_error": False,
+        "timeout": False,
+        "killed_by": killed_by,
+        **kwargs,
+    }
+
+
+modules = {
+    "pkg.mod": {
+        "foo": {
+            "0": entry(["a"]),
+            "1": entry(["a", "b"]),
+            "2": entry(None),
+        },
+        "bar": {
+            "0": entry(["c"]),
+            "1": entry(["b", "c"]),
+            "2": entry(["c"]),
+            "3": {"dead": True, "syntax_error": False, "timeout": True},
+        },
+    }
+}
+
+tests = ["a", "b", "c", "d"]
+
+
+def test_from_result():
+    matrix = KillMatrix.from_result(modules, tests)
+    assert len(matrix.mutants) == 6
+    assert matrix.killed_by(matrix.mutants.index(("pkg.mod", "foo", "1"))) == [
+        "a",
+        "b",
+    ]
+    assert matrix.killed_by(matrix.mutants.index(("pkg.mod", "foo", "2"))) == []
+
+
+def test_read_write(tmp_path):
+    matrix = KillMatrix.from_result(modules, tests)
+    matrix.write(tmp_path / "matrix.json")
+    other = KillMatrix.read(tmp_path / "matrix.json")
+    assert other.tests == matrix.tests
+    assert other.mutants == matrix.mutants
+    assert other.rows == matrix.rows
+
+
+def test_queries():
+    matrix = KillMatrix.from_result(modules, tests)
+    assert matrix.useless_tests() == ["d"]
+    assert sorted(matrix.minimal_tests()) == ["a", "c"]
+
+    def index(target: str, mutant: str) -> int:
+        return matrix.mutants.index(("pkg.mod", target, mutant))
+
+    assert matrix.subsumed() == {
+        index("foo", "1"): index("foo", "0"),
+        index("bar", "1"): index("bar", "0"),
+        index("bar", "2"): index("bar", "0"),
+    }
+
+
+def test_read_result_fail_fast(tmp_path):
+    result = Result()
+    result.modules = modules
+    result.write(tmp_path / "test-result.json")
+    assert read_result(tmp_path) is not None
+    result.modules = {"pkg.mod": {"foo": {"0": entry(["a"], fail_fast=True)}}}
+    result.write(tmp_path / "test-result.json")
+    assert read_result(tmp_path) is None
+    result.modules = {"pkg.mod": {"foo": {"0": entry(None, fail_fast=True)}}}
+    result.write(tmp_path / "test-result.json")
+    assert read_result(tmp_path) is not None
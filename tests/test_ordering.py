@@ -0,0 +1,54 @@
+import importlib
+
+import pytest
+
+from mutator.tester import kill_order
+
+cli_test = importlib.import_module("mutator.cli.test")
+
+
+def entry(killed_by: list[str] | None, **kwargs) -> dict:
+    return {
+        "dead": True,
+        "syntax_error": False,
+        "timeout": False,
+        "killed_by": killed_by,
+        **kwargs,
+    }
+
+
+def test_kill_order():
+    modules = {
+        "pkg.mod": {
+            "add": {
+                "0": entry(["a", "b"]),
+                "1": entry(["b"]),
+                "2": entry(None, dead=False),
+                "3": entry(["a", "c"], timeout=True),
+            },
+            # Results without `killed_by` fall back to the output.
+            "sub": {"0": entry(None, output="FAILED c\n")},
+        }
+    }
+    assert kill_order(modules) == {"pkg.mod:add": ["b", "a"], "pkg.mod:sub": ["c"]}
+
+
+@pytest.mark.parametrize("mode", ["subprocess", "worker", "fork"])
+def test_fail_fast_runs_first_tests_first(runner_project, mutant, mode):
+    runner_project.joinpath("tests", "test_mod.py").write_text(
+        "from pkg.mod import add\n\n\n"
+        + "def test_a():\n    assert add(1, 2) == 3\n\n\n"
+        + "def test_b():\n    assert add(2, 2) == 4\n"
+    )
+    first = ["tests/test_mod.py::test_b"]
+    try:
+        exit_code, _, _, report = cli_test._run_patches(
+            runner_project, 30, mode, 10, mutant("0", "return a - b"), ["-x"], first, {}
+        )
+    finally:
+        if cli_test._worker is not None:
+            cli_test._worker.close()
+            cli_test._worker = None
+    assert exit_code == 1
+    # test_a would have failed as well, but -x stops after test_b.
+    assert report == {"tests/test_mod.py::test_b": ["failed", report[first[0]][1]]}
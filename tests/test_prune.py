@@ -0,0 +1,75 @@
+import json
+
+from click.testing import CliRunner
+
+from mutator.ai.llm_stats import LLMStats
+from mutator.cli.prune import prune
+from mutator.generator import GeneratorConfig, Mutant
+from mutator.helper.pattern import Filter
+from mutator.result import Result
+from mutator.source import SourceFile
+from mutator.store import MutantStore
+
+
+def entry(killed_by: list[str] | None, **kwargs) -> dict:
+    return {
+        "dead": killed_by is not None,
+        "syntax_error": False,
+        "timeout": False,
+        "killed_by": killed_by,
+        **kwargs,
+    }
+
+
+def write_mutants(project, out) -> list:
+    root = project / "src"
+    source_file = SourceFile(root, root / "pkg" / "mod.py", Filter(["*"]))
+    store = MutantStore(out)
+    for body in ["return a - b", "return a * b", "return b + a"]:
+        store.add(
+            source_file.targets[0],
+            Mutant(f"def add(a, b):\n    {body}", None),
+            "model",
+            "generator",
+            "config",
+            GeneratorConfig({}, 1),
+            False,
+            LLMStats(),
+        )
+    return sorted(out.glob("pkg.mod/add/*.json"))
+
+
+def write_result(out, **kwargs):
+    result = Result()
+    result.tests = dict.fromkeys(["a", "b"])
+    # Every test killing mutant 1 also kills mutant 0, which is thus subsumed.
+    result.modules = {
+        "pkg.mod": {
+            "add": {
+                "0": entry(["a", "b"], **kwargs),
+                "1": entry(["a"], **kwargs),
+                "2": entry(None),
+            }
+        }
+    }
+    result.write(out / "test-result.json")
+
+
+def test_prune(runner_project):
+    out = runner_project / "out"
+    paths = write_mutants(runner_project, out)
+    write_result(out)
+    outcome = CliRunner().invoke(prune, ["-o", str(out)])
+    assert outcome.exit_code == 0, outcome.output
+    assert "marked 1 of 3 mutants" in outcome.output
+    marks = [json.loads(path.read_text()).get("subsumed_by") for path in paths]
+    assert marks == ["pkg.mod:add:1", None, None]
+
+
+def test_prune_fail_fast(runner_project):
+    out = runner_project / "out"
+    paths = write_mutants(runner_project, out)
+    write_result(out, fail_fast=True)
+    outcome = CliRunner().invoke(prune, ["-o", str(out)])
+    assert "error:" in outcome.output
+    assert all("subsumed_by" not in json.loads(path.read_text()) for path in paths)
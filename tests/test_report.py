@@ -0,0 +1,52 @@
+import pytest
+
+from mutator.tester import killing_tests
+from mutator_runner.report import TestReport
+
+tests = """
+import pytest
+
+
+@pytest.fixture
+def broken():
+    raise RuntimeError()
+
+
+def test_pass():
+    pass
+
+
+def test_fail():
+    assert False
+
+
+def test_error(broken):
+    pass
+
+
+@pytest.mark.skip
+def test_skip():
+    pass
+"""
+
+
+def test_report(tmp_path):
+    tmp_path.joinpath("test_sample.py").write_text(tests)
+    report = TestReport()
+    pytest.main(["-q", "-p", "no:cacheprovider", str(tmp_path)], plugins=[report])
+    outcomes = {
+        nodeid.split("::")[-1]: outcome
+        for nodeid, (outcome, _) in report.to_dict().items()
+    }
+    assert outcomes == {
+        "test_pass": "passed",
+        "test_fail": "failed",
+        "test_error": "error",
+        "test_skip": "skipped",
+    }
+
+
+def test_killing_tests():
+    report = {"a": ["passed", 0.1], "b": ["failed", 0.2], "c": ["error", 0.0]}
+    assert killing_tests(report, "") == ["b", "c"]
+    assert killing_tests(None, "FAILED a - assert\nERROR b\n") == ["a", "b"]
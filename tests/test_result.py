@@ -0,0 +1,83 @@
+import importlib
+import json
+
+from click.testing import CliRunner
+
+from mutator.ai.llm_stats import LLMStats
+from mutator.generator import GeneratorConfig, Mutant
+from mutator.helper.pattern import Filter
+from mutator.result import Journal, Result, compact_report
+from mutator.source import SourceFile
+from mutator.store import MutantStore
+
+cli_test = importlib.import_module("mutator.cli.test")
+
+
+def test_journal(tmp_path):
+    journal = Journal(tmp_path / "journal.jsonl")
+    assert list(journal.entries()) == []
+    journal.append("pkg.mod", "add", "0", {"dead": True})
+    journal.append("pkg.mod", "add", "1", {"dead": False})
+    assert list(journal.entries()) == [
+        ("pkg.mod", "add", "0", {"dead": True}),
+        ("pkg.mod", "add", "1", {"dead": False}),
+    ]
+    journal.clear()
+    assert list(journal.entries()) == []
+
+
+def test_compact_report(tmp_path):
+    report = {"a": ["passed", 0.5], "b": ["failed", 0.25], "c": ["passed", 0.25]}
+    assert compact_report(report) == ({"b": ["failed", 0.25]}, 2, 1.0)
+    result = Result()
+    assert result.add_tests(report) == ["a", "b", "c"]
+    assert result.add_tests({"c": None, "d": None}) == ["d"]
+    result.write(tmp_path / "test-result.json")
+    assert list(Result(tmp_path / "test-result.json").tests) == ["a", "b", "c", "d"]
+
+
+def test_journal_interrupted(tmp_path):
+    journal = Journal(tmp_path / "journal.jsonl")
+    journal.append("pkg.mod", "add", "0", {"dead": True})
+    with open(journal.path, "a") as file:
+        file.write('{"module": "pkg.mod", "symbol": "add", "mut')
+    assert list(journal.entries()) == [("pkg.mod", "add", "0", {"dead": True})]
+
+
+def test_resume(runner_project):
+    root = runner_project / "src"
+    source_file = SourceFile(root, root / "pkg" / "mod.py", Filter(["*"]))
+    out = runner_project / "out"
+    store = MutantStore(out)
+    for body in ["return a - b", "return a * b"]:
+        store.add(
+            source_file.targets[0],
+            Mutant(f"def add(a, b):\n    {body}", None),
+            "model",
+            "generator",
+            "config",
+            GeneratorConfig({}, 1),
+            False,
+            LLMStats(),
+        )
+    entry = {
+        "file": "pkg.mod/add/0.py",
+        "dead": True,
+        "syntax_error": False,
+        "source": "pkg/mod.py",
+        "timeout": False,
+        "output": "<from journal>",
+    }
+    Journal(out / "test-journal.jsonl").append("pkg.mod", "add", "0", entry)
+
+    args = ["-p", str(runner_project), "-o", str(out), "--resume", "--no-dedup"]
+    outcome = CliRunner().invoke(cli_test.test, args)
+    assert outcome.exit_code == 0, outcome.output
+    result = Result(out / "test-result.json")
+    assert result.get("pkg.mod", "add", "0") == entry
+    assert result.get("pkg.mod", "add", "1")["killed_by"] == [
+        "tests/test_mod.py::test_add"
+    ]
+    journal = out / "test-journal.jsonl"
+    assert len(journal.read_text().splitlines()) == 2
+    assert json.loads(journal.read_text().splitlines()[1])["mutant"] == "1"
@@ -0,0 +1,57 @@
+import importlib
+import os
+
+from mutator.tester.sandbox import create_sandbox
+
+cli_test = importlib.import_module("mutator.cli.test")
+
+
+def test_link(runner_project, tmp_path):
+    runner_project.joinpath("build").mkdir()
+    dest = create_sandbox("link", runner_project, tmp_path / "sandbox", ["build"])
+    source = runner_project / "src" / "pkg" / "mod.py"
+    linked = dest / "src" / "pkg" / "mod.py"
+    assert os.path.samefile(source, linked)
+    assert not (dest / "build").exists()
+    # An existing sandbox is reused.
+    assert create_sandbox("link", runner_project, dest, []) == dest
+
+
+def test_copy(runner_project, tmp_path):
+    dest = create_sandbox("copy", runner_project, tmp_path / "sandbox", [])
+    copied = dest / "src" / "pkg" / "mod.py"
+    assert not os.path.samefile(runner_project / "src" / "pkg" / "mod.py", copied)
+    assert copied.read_text() == "def add(a, b):\n    return a + b\n"
+
+
+def test_none_keeps_sources(runner_project, tmp_path):
+    assert create_sandbox("none", runner_project, tmp_path / "sandbox", []) == (
+        runner_project
+    )
+    source = runner_project / "src" / "pkg" / "mod.py"
+    original = source.read_bytes()
+    mutant = tmp_path / "0.py"
+    mutant.write_bytes(original.replace(b"a + b", b"a - b"))
+    job = cli_test._Job(
+        tmp_dir=str(tmp_path / "tmp"),
+        project=runner_project,
+        sandbox="none",
+        sandbox_ignore=[],
+        timeout=60,
+        git_reset=False,
+        mode="subprocess",
+        recycle=0,
+        fail_fast=False,
+        module_name="pkg.mod",
+        target_name="add",
+        index=0,
+        mutant=mutant,
+        source="pkg/mod.py",
+        tests=None,
+        first=[],
+        file_hash="",
+        limits={},
+    )
+    # Mutants are injected on import, the source file is never written.
+    assert cli_test._run_tester(job)[4]
+    assert source.read_bytes() == original
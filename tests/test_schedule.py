@@ -0,0 +1,27 @@
+from mutator.tester.schedule import CostModel, longest_first
+
+modules = {
+    "pkg.mod": {
+        "fast": {
+            "0": {"timeout": False, "syntax_error": False, "duration": 1.0},
+            "1": {"timeout": False, "syntax_error": False, "duration": 3.0},
+            "2": {"timeout": False, "syntax_error": True, "duration": 100.0},
+        },
+        "slow": {
+            "0": {"timeout": True, "syntax_error": False, "duration": 60.0},
+            "1": {"timeout": False, "syntax_error": False, "duration": 4.0},
+        },
+    }
+}
+
+
+def test_cost():
+    model = CostModel(modules)
+    assert model.cost("pkg.mod", "fast", None, 60.0) == 2.0
+    assert model.cost("pkg.mod", "slow", None, 60.0) == 32.0
+    assert model.cost("pkg.mod", "unknown", 5.0, 60.0) == 5.0
+    assert model.cost("pkg.mod", "unknown", 5.0, 2.0) == 2.0
+
+
+def test_longest_first():
+    assert longest_first(["a", "b", "c"], [1.0, 3.0, 2.0]) == ["b", "c", "a"]
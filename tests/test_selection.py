@@ -0,0 +1,79 @@
+import pytest
+
+from mutator.tester.selection import CoverageFailed, TestIndex
+from mutator_runner.coverage import CallCoverage
+
+source = b"""
+def foo():
+    return 1
+
+
+@decorator
+def bar():
+    def inner():
+        return 2
+
+    return inner()
+"""
+
+
+def test_build(tmp_path):
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "pkg" / "mod.py").write_bytes(source)
+    coverage = {
+        "files": ["src/pkg/mod.py", "tests/test_mod.py"],
+        "collection": [[1, 1]],
+        "tests": {
+            "tests/test_mod.py::test_foo": {"duration": 0.1, "calls": [[0, 2]]},
+            "tests/test_mod.py::test_bar": {"duration": 0.1, "calls": [[0, 6]]},
+            "tests/test_mod.py::test_inner": {"duration": 0.1, "calls": [[0, 9]]},
+        },
+    }
+    index = TestIndex.build(coverage, tmp_path)
+    assert index.tests_for("pkg.mod", "foo") == ["tests/test_mod.py::test_foo"]
+    assert index.tests_for("pkg.mod", "bar") == [
+        "tests/test_mod.py::test_bar",
+        "tests/test_mod.py::test_inner",
+    ]
+    assert index.tests_for("pkg.mod", "bar.inner") == ["tests/test_mod.py::test_inner"]
+    assert index.tests_for("pkg.mod", "unknown") is None
+    assert index.durations["tests/test_mod.py::test_foo"] == 0.1
+
+
+def test_collection(tmp_path):
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "pkg" / "mod.py").write_bytes(source)
+    coverage = {"files": ["src/pkg/mod.py"], "collection": [[0, 2]], "tests": {}}
+    index = TestIndex.build(coverage, tmp_path)
+    assert index.tests_for("pkg.mod", "foo") is None
+    assert index.tests_for("pkg.mod", "bar") == []
+
+
+def test_no_project_calls(tmp_path):
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "pkg" / "mod.py").write_bytes(source)
+    coverage = {
+        "files": [],
+        "collection": [],
+        "tests": {"tests/test_mod.py::test_foo": {"duration": 0.1, "calls": []}},
+    }
+    with pytest.raises(CoverageFailed):
+        TestIndex.build(coverage, tmp_path)
+
+
+def test_project_hash(tmp_path):
+    index = TestIndex({"pkg.mod:foo": []}, {}, "hash")
+    index.write(tmp_path / "test-index.json")
+    assert TestIndex.read(tmp_path / "test-index.json").project_hash == "hash"
+
+
+def test_symlinked_files(tmp_path):
+    original = tmp_path / "original.py"
+    original.write_text("")
+    (tmp_path / "sandbox" / "src").mkdir(parents=True)
+    link = tmp_path / "sandbox" / "src" / "mod.py"
+    link.symlink_to(original)
+    plugin = CallCoverage(tmp_path / "sandbox")
+    assert plugin._file_index(str(link)) == 0
+    assert plugin.paths == ["src/mod.py"]
+    assert plugin._file_index(str(original)) is None
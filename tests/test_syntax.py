@@ -0,0 +1,20 @@
+from mutator.tester import syntax_error
+
+
+def test_valid():
+    assert syntax_error(b"def foo(a):\n    return a + 1\n", "0.py") is None
+
+
+def test_syntax_error():
+    error = syntax_error(b"def foo(a):\n    return a +\n", "pkg.mod/foo/0.py")
+    assert error.startswith('  File "pkg.mod/foo/0.py", line 2')
+    assert error.endswith("SyntaxError: invalid syntax\n")
+
+
+def test_not_executed():
+    # Only compiled, so the code raising at runtime is not an error.
+    assert syntax_error(b"raise SystemExit(1)\n", "0.py") is None
+
+
+def test_null_bytes():
+    assert syntax_error(b"x = 1\0\n", "0.py") is not None
@@ -0,0 +1,90 @@
+import importlib
+import signal
+
+import pytest
+
+from mutator.tester import RunnerWorker, WorkerCrashed
+
+# `mutator.cli.test` is shadowed by the click command of the same name.
+cli_test = importlib.import_module("mutator.cli.test")
+
+
+@pytest.fixture
+def worker(runner_project):
+    worker = RunnerWorker(runner_project, recycle=2)
+    yield worker
+    worker.close()
+
+
+def test_run_and_restore(worker, mutant):
+    exit_code, _, usage, report = worker.run([], 30)
+    assert exit_code == 0
+    assert report["tests/test_mod.py::test_add"][0] == "passed"
+    assert usage["max_rss"] > 0
+    exit_code, output, _, report = worker.run(mutant("0", "return a - b"), 30)
+    assert exit_code == 1
+    assert "FAILED tests/test_mod.py::test_add" in output
+    assert report["tests/test_mod.py::test_add"][0] == "failed"
+
+
+def test_recycle(worker, mutant):
+    worker.run([], 30)
+    pid = worker.process.pid
+    assert worker.run(mutant("0", "return a - b"), 30)[0] == 1
+    assert worker.process.pid == pid
+    # The third mutant is tested by a fresh worker, which must not see the
+    # previous mutant.
+    assert worker.run([], 30)[0] == 0
+    assert worker.process.pid != pid
+
+
+def test_timeout(worker, mutant):
+    exit_code, output, _, _ = worker.run(mutant("0", "while True: pass"), 2)
+    assert (exit_code, output) == (None, "<timeout>")
+    assert worker.process is None
+    assert worker.run([], 30)[0] == 0
+
+
+def test_crash(worker, mutant):
+    with pytest.raises(WorkerCrashed):
+        worker.run(mutant("0", "import os; os._exit(3)"), 30)
+    assert worker.process is None
+    assert worker.run([], 30)[0] == 0
+
+
+def test_cpu_limit(worker, mutant):
+    spin = mutant("0", "while True: pass")
+    exit_code, *_ = worker.run(spin, 30, limits={"cpu": 1})
+    assert exit_code == -signal.SIGXCPU
+    assert worker.run([], 30)[0] == 0
+
+
+def test_killed(worker, mutant):
+    kill = mutant("0", "import os, signal; os.kill(os.getpid(), signal.SIGKILL)")
+    # Reported as result (e.g. of the OOM killer) instead of a crash.
+    exit_code, *_ = worker.run(kill, 30)
+    assert exit_code == -signal.SIGKILL
+    assert worker.run([], 30)[0] == 0
+
+
+def test_memory_error(worker, runner_project):
+    # Raised by pytest itself, as MemoryErrors of tests only fail the test.
+    runner_project.joinpath("tests", "conftest.py").write_text(
+        "def pytest_unconfigure(config):\n    raise MemoryError()\n"
+    )
+    exit_code, output, _, _ = worker.run([], 30)
+    assert exit_code == 1
+    assert output.endswith("<memory limit exceeded>")
+
+
+def test_crash_falls_back_to_subprocess(runner_project, mutant):
+    crash = mutant("0", "import os; os._exit(3)")
+    try:
+        exit_code, *_ = cli_test._run_worker(
+            runner_project, 30, 10, False, crash, [], [], {}
+        )
+    finally:
+        cli_test._worker.close()
+        cli_test._worker = None
+    # Retried in a fresh interpreter, which exits with the crash.
+    assert exit_code == 3